@@ -0,0 +1,78 @@
+"""
+Microbenchmark: dictionary rows validated by Pydantic vs. tuple rows mapped by fetch_one
+
+Runs against the in-memory SQLite backend, so no database server is needed:
+
+    python benchmarks/bench_fetch_one.py --iterations 20000
+
+Prints the time per user lookup for both paths, once including the query and
+once for building the model from an already fetched row only.
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DB_BACKEND", "sqlite")
+logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+from fastapiutils.database_service import DatabaseService  # noqa: E402
+from fastapiutils.models import UserInDB  # noqa: E402
+from fastapiutils.row_mapping import column_names, get_row_mapper  # noqa: E402
+
+SQL = "SELECT * FROM user WHERE id = %s"
+
+
+def report(name: str, seconds: float, iterations: int, baseline: float = 0.0) -> None:
+    per_call_us = seconds / iterations * 1e6
+    speedup = f"  ({baseline / seconds:.1f}x)" if baseline else ""
+    print(f"{name:<40} {per_call_us:8.2f} us/lookup{speedup}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    db_service = DatabaseService()
+    user_id = db_service.generate_uuid("user")
+    db_service.execute_modification_query(
+        "INSERT INTO user (id, username, email, hashed_password) VALUES (%s, %s, %s, %s)",
+        (user_id, "benchmark", "benchmark@example.com", "x" * 60)
+    )
+    params = (user_id,)
+
+    def validated() -> UserInDB:
+        return UserInDB(**db_service.execute_single_query(SQL, params))
+
+    def mapped() -> UserInDB:
+        return db_service.fetch_one(SQL, params, model=UserInDB)
+
+    assert validated() == mapped()
+
+    print(f"{args.iterations} lookups on the {db_service.backend.name} backend")
+    query_validated = timeit.timeit(validated, number=args.iterations)
+    report("execute_single_query + UserInDB(**row)", query_validated, args.iterations)
+    report("fetch_one(model=UserInDB)", timeit.timeit(mapped, number=args.iterations), args.iterations, query_validated)
+
+    # Model construction alone, without the database round trip
+    row_dict = db_service.execute_single_query(SQL, params)
+    connection = db_service.create_connection()
+    cursor = connection.cursor()
+    cursor.execute(SQL, params)
+    row_tuple = cursor.fetchone()
+    mapper = get_row_mapper(UserInDB, column_names(cursor.description))
+    cursor.close()
+    connection.close()
+
+    build_validated = timeit.timeit(lambda: UserInDB(**row_dict), number=args.iterations)
+    report("UserInDB(**row) only", build_validated, args.iterations)
+    report("RowMapper(row) only", timeit.timeit(lambda: mapper(row_tuple), number=args.iterations), args.iterations, build_validated)
+
+    db_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: case-insensitive user lookups with LOWER() vs. the column collation
+
+Seeds the user table with `--users` rows and times lookups by username and by
+email written as `LOWER(column) = LOWER(%s)`, which scans the table, against
+plain `column = %s`, which uses the unique key. Runs on the in-memory SQLite
+backend by default, set DB_BACKEND=mysql and the DB_* variables to run it
+against a MySQL server (use an empty database, the rows are not removed):
+
+    python benchmarks/bench_user_lookup.py --users 1000000 --iterations 200
+
+Prints the query plan and the time per lookup of both forms.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("DB_BACKEND", "sqlite")
+logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+from fastapiutils.database_service import DatabaseService  # noqa: E402
+from fastapiutils.user_queries import SELECT_USER_BY_EMAIL, SELECT_USER_BY_USERNAME  # noqa: E402
+
+LOWER_BY_USERNAME = "SELECT * FROM user WHERE LOWER(username) = LOWER(%s)"
+LOWER_BY_EMAIL = "SELECT * FROM user WHERE LOWER(email) = LOWER(%s)"
+INSERT_USER = "INSERT INTO user (id, username, email, hashed_password) VALUES (%s, %s, %s, %s)"
+
+
+def seed(db_service: DatabaseService, users: int) -> None:
+    """Insert `users` rows with usernames user0..userN and matching emails"""
+    hashed_password = "x" * 60
+    rows = ((f"{i:036d}", f"user{i}", f"user{i}@example.com", hashed_password) for i in range(users))
+    started = time.perf_counter()
+    db_service.execute_many_modification(INSERT_USER, rows, batch_size=5000)
+    print(f"Seeded {users} users in {time.perf_counter() - started:.1f}s")
+
+
+def query_plan(db_service: DatabaseService, sql: str) -> str:
+    explain = "EXPLAIN QUERY PLAN " if db_service.backend.name == "sqlite" else "EXPLAIN "
+    rows = db_service.execute_query(explain + sql, ("user1",), dictionary=False) or []
+    return " | ".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def time_lookups(db_service: DatabaseService, sql: str, values: list) -> float:
+    """Return the average seconds per lookup"""
+    started = time.perf_counter()
+    for value in values:
+        assert db_service.execute_single_query(sql, (value,)) is not None
+    return (time.perf_counter() - started) / len(values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    db_service = DatabaseService()
+    seed(db_service, args.users)
+
+    # Mixed case input, the lookups must still match
+    picks = [random.randrange(args.users) for _ in range(args.iterations)]
+    usernames = [f"User{i}" for i in picks]
+    emails = [f"USER{i}@Example.com" for i in picks]
+
+    print(f"{args.iterations} lookups among {args.users} users on the {db_service.backend.name} backend")
+    for name, lower_sql, indexed_sql, values in (
+        ("username", LOWER_BY_USERNAME, SELECT_USER_BY_USERNAME, usernames),
+        ("email", LOWER_BY_EMAIL, SELECT_USER_BY_EMAIL, emails),
+    ):
+        print(f"\nBy {name}")
+        print(f"  LOWER() plan:  {query_plan(db_service, lower_sql)}")
+        print(f"  indexed plan:  {query_plan(db_service, indexed_sql)}")
+        lower = time_lookups(db_service, lower_sql, values)
+        indexed = time_lookups(db_service, indexed_sql, values)
+        print(f"  LOWER(column) = LOWER(%s)  {lower * 1e6:12.1f} us/lookup")
+        print(f"  column = %s                {indexed * 1e6:12.1f} us/lookup  ({lower / indexed:.0f}x)")
+
+    db_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
 from .auth_service import AuthService
 from .models import User, UserInDB, CreateUser, Token, TokenData, RefreshTokenRequest, VerificationCode, VerifyEmailRequest
 from .database_service import DatabaseService
+from .async_database_service import AsyncDatabaseService
+from .resilience import DatabaseTimeoutError, DatabaseUnavailableError
+from .async_user_queries import AsyncUserQueries
+from .async_verification_queries import AsyncVerificationQueries
 from .mail_service import MailService
 from .i18n_service import I18nService
 from .dependencies import (
     CurrentAdminUser,
     setup_dependencies, 
+    shutdown_dependencies,
     get_auth_service, 
     get_database_service, 
+    get_async_database_service,
+    database_request_scope,
     get_mail_service, 
     get_i18n_service,
     CurrentUser, 
@@ -28,11 +35,19 @@ __all__ = [
     "VerificationCode",
     "VerifyEmailRequest",
     "DatabaseService",
+    "AsyncDatabaseService",
+    "DatabaseUnavailableError",
+    "DatabaseTimeoutError",
+    "AsyncUserQueries",
+    "AsyncVerificationQueries",
     "MailService",
     "I18nService",
     "setup_dependencies",
+    "shutdown_dependencies",
     "get_auth_service",
     "get_database_service",
+    "get_async_database_service",
+    "database_request_scope",
     "get_mail_service",
     "get_i18n_service",
     "CurrentUser",
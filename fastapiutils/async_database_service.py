@@ -0,0 +1,426 @@
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Tuple, Type, AsyncIterator, Iterable
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+from .database_service import BaseDatabaseService, rewrite_multi_row_insert, _batches
+from .ids import new_id
+from .query_metrics import QueryMetrics
+from .row_mapping import ModelT, column_names, get_row_mapper
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class AsyncRowIterator:
+    """
+    Async iterator over an unbuffered (server-side) cursor that fetches rows in batches.
+
+    The connection goes back to the pool once all rows were read. If iteration stops
+    early, aclose() closes the connection instead of draining the unread rows.
+    """
+
+    def __init__(self, pool, connection, cursor, batch_size: int):
+        self._pool = pool
+        self._connection = connection
+        self._cursor = cursor
+        self._batch_size = batch_size
+        self._batch: List[Any] = []
+        self._position = 0
+        self._closed = False
+
+    def __aiter__(self) -> "AsyncRowIterator":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._position >= len(self._batch):
+            if self._closed:
+                raise StopAsyncIteration
+            self._batch = await self._cursor.fetchmany(self._batch_size)
+            self._position = 0
+            if not self._batch:
+                await self._finish(exhausted=True)
+                raise StopAsyncIteration
+        row = self._batch[self._position]
+        self._position += 1
+        return row
+
+    async def __aenter__(self) -> "AsyncRowIterator":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop iterating and give up the connection"""
+        await self._finish(exhausted=False)
+
+    async def _finish(self, exhausted: bool) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._batch = []
+        if exhausted:
+            await self._cursor.close()
+            await self._connection.rollback()
+        else:
+            self._connection.close()
+        self._pool.release(self._connection)
+
+
+class AsyncDatabaseService(BaseDatabaseService):
+    """
+    Database manager for MySQL operations on an asyncio event loop.
+
+    Uses the same DB_* environment variables as DatabaseService but talks to the
+    database through aiomysql with its own connection pool, so queries never block
+    the event loop. The schema itself is still bootstrapped by DatabaseService.
+    """
+
+    def __init__(self):
+        """Initialize the async database manager with environment variables"""
+        if aiomysql is None:
+            logger.error("aiomysql is not installed, cannot create AsyncDatabaseService")
+            raise ImportError("AsyncDatabaseService requires aiomysql. Install it with 'pip install fastapiutils[async]'")
+        super().__init__()
+        if self.backend_name != "mysql":
+            logger.error(f"AsyncDatabaseService does not support the '{self.backend_name}' backend")
+            raise ValueError("AsyncDatabaseService requires DB_BACKEND=mysql")
+        self.pool = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._transaction_connection: ContextVar = ContextVar(f"async_db_transaction_{id(self)}", default=None)
+        self.query_metrics = QueryMetrics(slow_query_ms=self._get_env_setting("DB_SLOW_QUERY_MS", 500.0, float))
+        logger.info("AsyncDatabaseService initialized")
+
+
+    async def get_pool(self):
+        """Return the aiomysql pool, creating it on first use inside the running event loop"""
+        if self.pool is not None:
+            return self.pool
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+        async with self._pool_lock:
+            if self.pool is None:
+                self.pool = await aiomysql.create_pool(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    db=self.database,
+                    minsize=max(self.pool_size, 1),
+                    maxsize=max(self.pool_size, 1) + self.pool_max_overflow,
+                    pool_recycle=self.pool_recycle,
+                    autocommit=False,
+                )
+                logger.info("Async database pool created")
+        return self.pool
+
+
+    async def startup(self) -> None:
+        """Create the pool before the first request, which opens DB_POOL_SIZE connections, and ping one"""
+        pool = await self.get_pool()
+        async with pool.acquire() as connection:
+            await connection.ping(reconnect=False)
+
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+
+    def get_query_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return latency, row and error statistics per normalized SQL statement"""
+        return self.query_metrics.snapshot()
+
+
+    async def _release(self, pool, connection) -> None:
+        """Roll back any open transaction and hand the connection back to the pool"""
+        if not connection.get_transaction_status():
+            pool.release(connection)
+            return
+        try:
+            await connection.rollback()
+        except aiomysql.Error as err:
+            logger.warning(f"Closing connection that failed to roll back: {err}")
+            connection.close()
+        pool.release(connection)
+
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Any]:
+        """
+        Pin one connection for a unit of work and commit once at the end.
+
+        Queries awaited inside the block without an explicit connection run on the
+        pinned connection and are not committed individually. The whole block is
+        rolled back if it raises. Nested calls join the outer transaction.
+
+        Usage:
+            async with db_service.transaction() as connection:
+                ...
+        """
+        current = self._transaction_connection.get()
+        if current is not None:
+            yield current
+            return
+
+        pool = await self.get_pool()
+        connection = await pool.acquire()
+        token = self._transaction_connection.set(connection)
+        try:
+            await connection.begin()
+            yield connection
+            await connection.commit()
+        finally:
+            self._transaction_connection.reset(token)
+            await self._release(pool, connection)
+
+
+    async def execute_query(self, sql: str, params: Optional[Tuple] = None, dictionary: bool = True, connection=None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Execute a SELECT query with parameterized inputs to prevent SQL injection.
+
+        Args:
+            sql: SQL query with %s placeholders
+            params: Tuple of parameters to bind to the query
+            dictionary: Whether to return results as dictionaries
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+
+        Returns:
+            List of dictionaries (if dictionary=True) or tuples, or None on error
+        """
+        return await self._select(sql, params, dictionary, connection)
+
+
+    async def _select(self, sql: str, params: Optional[Tuple], dictionary: bool, connection, describe: bool = False) -> Any:
+        """
+        Shared body of execute_query and fetch_all: returns the rows, or with
+        `describe` a (column names, rows) tuple, and None on error.
+        """
+        pool = None
+        if connection is None:
+            connection = self._transaction_connection.get()
+        if connection is None:
+            pool = await self.get_pool()
+            connection = await pool.acquire()
+
+        rows, error = 0, None
+        started = time.perf_counter()
+        try:
+            async with connection.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor) as cursor:
+                await cursor.execute(sql, params or ())
+                data = list(await cursor.fetchall())
+                rows = len(data)
+                if describe:
+                    return column_names(cursor.description), data
+                return data
+        except aiomysql.Error as err:
+            error = err
+            logger.error("Executing query failed!")
+            logger.error(f"SQL:   {sql}")
+            logger.error(f"Params: {params}")
+            logger.error(f"Error: {err}")
+            return None
+        finally:
+            if pool is not None:
+                await self._release(pool, connection)
+            self.query_metrics.record(sql, params, time.perf_counter() - started, rows, error)
+
+
+    async def execute_single_query(self, sql: str, params: Optional[Tuple] = None, connection=None) -> Optional[Dict[str, Any]]:
+        """
+        Execute a SELECT query that returns a single row with parameterized inputs.
+
+        Args:
+            sql: SQL query with %s placeholders
+            params: Tuple of parameters to bind to the query
+            connection: Optional existing connection to use
+
+        Returns:
+            Dictionary with the first result, or None if no results
+        """
+        result = await self.execute_query(sql, params, dictionary=True, connection=connection)
+        if isinstance(result, list) and len(result) > 0:
+            return result[0]
+        return None
+
+
+    async def fetch_all(self, sql: str, params: Optional[Tuple] = None, *, model: Type[ModelT], connection=None) -> Optional[List[ModelT]]:
+        """
+        Execute a SELECT query and return its rows as instances of `model`.
+
+        Rows are mapped onto the model fields and validated, see
+        DatabaseService.fetch_all.
+
+        Returns:
+            List of models, or None on error
+        """
+        result = await self._select(sql, params, False, connection, describe=True)
+        if result is None:
+            return None
+        columns, rows = result
+        if not rows:
+            return []
+        return get_row_mapper(model, columns).map_rows(rows)
+
+
+    async def fetch_one(self, sql: str, params: Optional[Tuple] = None, *, model: Type[ModelT], connection=None) -> Optional[ModelT]:
+        """
+        Execute a SELECT query and return its first row as an instance of `model`.
+
+        Returns:
+            The model built from the first row, or None if no results
+        """
+        result = await self._select(sql, params, False, connection, describe=True)
+        if not result or not result[1]:
+            return None
+        columns, rows = result
+        return get_row_mapper(model, columns)(rows[0])
+
+
+    async def iter_query(self, sql: str, params: Optional[Tuple] = None, batch_size: int = 1000, dictionary: bool = True) -> AsyncRowIterator:
+        """
+        Execute a SELECT query and stream its rows instead of loading them all at once.
+
+        The query runs on a dedicated connection with a server-side cursor, so memory
+        stays flat regardless of the result size. Rows are read from the server in
+        batches of `batch_size`. Unlike execute_query, errors are raised.
+
+        Args:
+            sql: SQL query with %s placeholders
+            params: Tuple of parameters to bind to the query
+            batch_size: Number of rows fetched per round trip
+            dictionary: Whether to return rows as dictionaries
+
+        Returns:
+            Async iterator over the rows that releases its connection when exhausted or closed
+        """
+        pool = await self.get_pool()
+        connection = await pool.acquire()
+        try:
+            cursor = await connection.cursor(aiomysql.SSDictCursor if dictionary else aiomysql.SSCursor)
+            await cursor.execute(sql, params or ())
+        except aiomysql.Error as err:
+            logger.error("Executing streaming query failed!")
+            logger.error(f"SQL:   {sql}")
+            logger.error(f"Params: {params}")
+            logger.error(f"Error: {err}")
+            connection.close()
+            pool.release(connection)
+            raise
+        return AsyncRowIterator(pool, connection, cursor, batch_size)
+
+
+    async def execute_modification_query(self, sql: str, params: Optional[Tuple] = None, connection=None) -> Optional[int]:
+        """
+        Execute an INSERT, UPDATE, or DELETE query with parameterized inputs.
+
+        Args:
+            sql: SQL query with %s placeholders
+            params: Tuple of parameters to bind to the query
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+
+        Returns:
+            Last inserted ID for INSERT queries, or number of affected rows
+        """
+        pool = None
+        if connection is None:
+            connection = self._transaction_connection.get()
+        if connection is None:
+            pool = await self.get_pool()
+            connection = await pool.acquire()
+        # Statements inside transaction() are committed when the block exits
+        in_transaction = connection is self._transaction_connection.get()
+
+        rows, error = 0, None
+        started = time.perf_counter()
+        try:
+            async with connection.cursor() as cursor:
+                await cursor.execute(sql, params or ())
+                if not in_transaction:
+                    await connection.commit()
+                rows = max(cursor.rowcount, 0)
+                # For INSERT queries, return the last inserted ID
+                # For UPDATE/DELETE queries, return the number of affected rows
+                return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
+        except aiomysql.Error as err:
+            error = err
+            logger.error("Executing modification query failed!")
+            logger.error(f"SQL:   {sql}")
+            logger.error(f"Params: {params}")
+            logger.error(f"Error: {err}")
+            raise
+        finally:
+            if pool is not None:
+                await self._release(pool, connection)
+            self.query_metrics.record(sql, params, time.perf_counter() - started, rows, error)
+
+
+    async def execute_many_modification(self, sql: str, seq_of_params: Iterable[Tuple], batch_size: int = 1000, connection=None) -> List[int]:
+        """
+        Execute an INSERT, UPDATE, or DELETE query for many parameter tuples.
+
+        Simple `INSERT ... VALUES (...)` statements are rewritten into one multi-row
+        INSERT per batch. Other statements are sent with executemany(). Each batch is
+        committed on its own unless the call runs inside transaction().
+
+        Args:
+            sql: SQL query with %s placeholders for a single row
+            seq_of_params: Iterable of parameter tuples, one per row
+            batch_size: Maximum number of rows per batch
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+
+        Returns:
+            Number of affected rows for each batch
+        """
+        pool = None
+        if connection is None:
+            connection = self._transaction_connection.get()
+        if connection is None:
+            pool = await self.get_pool()
+            connection = await pool.acquire()
+        in_transaction = connection is self._transaction_connection.get()
+
+        affected_rows = []
+        error = None
+        started = time.perf_counter()
+        try:
+            async with connection.cursor() as cursor:
+                for batch in _batches(seq_of_params, batch_size):
+                    rewritten = rewrite_multi_row_insert(sql, batch)
+                    if rewritten is not None:
+                        await cursor.execute(*rewritten)
+                    else:
+                        await cursor.executemany(sql, batch)
+                    if not in_transaction:
+                        await connection.commit()
+                    affected_rows.append(cursor.rowcount)
+            return affected_rows
+        except aiomysql.Error as err:
+            error = err
+            logger.error("Executing bulk modification query failed!")
+            logger.error(f"SQL:   {sql}")
+            logger.error(f"Committed batches: {len(affected_rows)}")
+            logger.error(f"Error: {err}")
+            raise
+        finally:
+            if pool is not None:
+                await self._release(pool, connection)
+            self.query_metrics.record(sql, None, time.perf_counter() - started, max(sum(affected_rows), 0), error)
+
+
+    async def generate_uuid(self, table_name: Optional[str] = None, max_tries: int = 1000) -> Optional[str]:
+        """Generate a time-ordered UUIDv7 for a new row without querying the table"""
+        return new_id()
@@ -0,0 +1,321 @@
+"""
+Authentication database queries for AsyncDatabaseService
+"""
+from fastapi import HTTPException, status
+from .i18n_service import I18nService
+from .models import UserInDBNoPassword, UserInDB, UpdateUser
+from .async_database_service import AsyncDatabaseService
+from .database_service import is_duplicate_key_error
+from .user_queries import SELECT_ALL_USERS, SELECT_USER_BY_LOGIN, SELECT_USERNAME_BY_ID, USER_IN_DB_COLUMNS
+
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+CREATE_USER_ATTEMPTS = 3
+
+
+class AsyncUserQueries:
+    """Awaitable counterparts of the UserQueries methods"""
+
+    @staticmethod
+    async def get_user_by_id(user_id: str, db_service: AsyncDatabaseService) -> Optional[UserInDB]:
+        """Get user by ID"""
+        result = await db_service.execute_single_query(
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE id = %s",
+            (user_id,)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+
+    @staticmethod
+    async def get_user_by_username(username: str, db_service: AsyncDatabaseService) -> Optional[UserInDB]:
+        """Get user by username"""
+        result = await db_service.execute_single_query(
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE username = %s",
+            (username,)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+
+    @staticmethod
+    async def get_user_by_email(email: str, db_service: AsyncDatabaseService) -> Optional[UserInDB]:
+        """Get user by email"""
+        result = await db_service.execute_single_query(
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE email = %s",
+            (email,)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+
+    @staticmethod
+    async def get_user_by_login(identifier: str, db_service: AsyncDatabaseService) -> Optional[UserInDB]:
+        """Get user by username, or by email if no username matches, in one query"""
+        result = await db_service.execute_single_query(
+            SELECT_USER_BY_LOGIN,
+            (identifier, identifier)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+
+    @staticmethod
+    async def get_user_by_username_and_email(username: str, email: str, db_service: AsyncDatabaseService) -> Optional[UserInDB]:
+        """Get user by username and email"""
+        result = await db_service.execute_single_query(
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE username = %s AND email = %s",
+            (username, email)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+
+    @staticmethod
+    async def get_user_by_stripe_customer_id(
+        stripe_customer_id: str,
+        db_service: AsyncDatabaseService
+        ) -> Optional[UserInDB]:
+        """Get user by Stripe customer ID"""
+        result = await db_service.execute_single_query(
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE stripe_customer_id = %s",
+            (stripe_customer_id,)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+
+
+    @staticmethod
+    async def get_username_by_id(
+        user_id: str,
+        db_service: AsyncDatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en"
+        ) -> str:
+        """Get username by user ID"""
+        result = await db_service.execute_single_query(SELECT_USERNAME_BY_ID, (user_id,))
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=i18n_service.t("api.auth.user_management.user_not_found", locale),
+            )
+        return result["username"]
+
+
+    @staticmethod
+    async def create_user(username: str,
+                    email: str,
+                    hashed_password: str,
+                    db_service: AsyncDatabaseService,
+                    i18n_service: I18nService,
+                    locale: str
+                   ) -> None:
+        """Create a new user in the database"""
+        # IDs are generated locally, so only a real primary key collision is retried
+        for _ in range(CREATE_USER_ATTEMPTS):
+            uid = await AsyncUserQueries.generate_user_uuid(db_service=db_service)
+            try:
+                await db_service.execute_modification_query(
+                    "INSERT INTO user (id, username, email, hashed_password) VALUES (%s, %s, %s, %s)",
+                    (uid, username, email, hashed_password)
+                )
+                return
+            except Exception as e:
+                if not is_duplicate_key_error(e, key="PRIMARY"):
+                    raise
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=i18n_service.t("api.auth.user_management.user_creation_failed", locale),
+        )
+
+    @staticmethod
+    async def update_user_last_seen(user_id: str, db_service: AsyncDatabaseService) -> None:
+        """Update user's last seen timestamp"""
+        current_time = datetime.now(timezone.utc)
+        await db_service.execute_modification_query(
+            "UPDATE user SET last_seen = %s WHERE id = %s",
+            (current_time, user_id)
+        )
+
+    @staticmethod
+    async def update_user_password(
+        user_id: str,
+        hashed_password: str,
+        db_service: AsyncDatabaseService
+        ) -> None:
+        """Update user's password"""
+        await db_service.execute_modification_query(
+            "UPDATE user SET hashed_password = %s WHERE id = %s",
+            (hashed_password, user_id)
+        )
+
+    @staticmethod
+    async def update_user_fields(user_id: str, user_update: UpdateUser, db_service: AsyncDatabaseService) -> bool:
+        """Update user fields dynamically"""
+        update_fields = []
+        update_values = []
+
+        if user_update.username is not None:
+            update_fields.append("username = %s")
+            update_values.append(user_update.username)
+
+        if update_fields:
+            update_values.append(user_id)
+            query = f"UPDATE user SET {', '.join(update_fields)} WHERE id = %s"
+            await db_service.execute_modification_query(query, tuple(update_values))
+
+        return len(update_fields) > 0  # Return True if any fields were updated
+
+    @staticmethod
+    async def generate_user_uuid(db_service: AsyncDatabaseService) -> Optional[str]:
+        """Generate a new time-ordered UUID for a user"""
+        return await db_service.generate_uuid("user")
+
+    @staticmethod
+    async def get_user_ids_to_names(
+        user_ids: list[str],
+        db_service: AsyncDatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en"
+        ) -> dict[str, str]:
+        """Get user names by their IDs"""
+        if not user_ids:
+            return {}
+
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        try:
+            results = await db_service.execute_query(
+                sql = f"SELECT id, username FROM user WHERE id IN ({placeholders})",
+                params=tuple(user_ids)
+                )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t(
+                    "api.auth.user_management.user_ids_to_names_failed",
+                    locale=locale,
+                    error=str(e)
+                    ),
+            )
+
+        return {result['id']: result['username'] for result in results} if results else {}
+
+
+    @staticmethod
+    async def get_all_users(
+        db_service: AsyncDatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en"
+        ) -> list[UserInDBNoPassword]:
+        """Get all users from the database"""
+        try:
+            results = await db_service.execute_query(SELECT_ALL_USERS)
+            return [UserInDBNoPassword(**result) for result in results] if results else []
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t(
+                    "api.auth.user_management.get_all_users_failed",
+                    locale=locale,
+                    error=str(e)
+                ),
+            )
+
+    @staticmethod
+    async def iter_all_users(
+        db_service: AsyncDatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en",
+        batch_size: int = 1000
+        ) -> AsyncIterator[UserInDBNoPassword]:
+        """Stream all users from the database without loading the whole table into memory"""
+        try:
+            rows = await db_service.iter_query(SELECT_ALL_USERS, batch_size=batch_size)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t(
+                    "api.auth.user_management.get_all_users_failed",
+                    locale=locale,
+                    error=str(e)
+                ),
+            )
+
+        async def _users() -> AsyncIterator[UserInDBNoPassword]:
+            async with rows:
+                async for row in rows:
+                    yield UserInDBNoPassword(**row)
+        return _users()
+
+    @staticmethod
+    async def delete_user(
+        user_id: str,
+        db_service: AsyncDatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en"
+        ) -> dict:
+        """Delete a user by ID"""
+        # First check if user exists
+        existing_user = await AsyncUserQueries.get_user_by_id(user_id, db_service)
+        if not existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=i18n_service.t("api.auth.user_management.user_not_found", locale),
+            )
+
+        try:
+            await db_service.execute_modification_query(
+                sql="DELETE FROM user WHERE id = %s",
+                params=(user_id,)
+            )
+            return {"detail": i18n_service.t("api.auth.user_management.user_deleted_successfully", locale=locale)}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t(
+                    "api.auth.user_management.user_deletion_failed",
+                    locale=locale,
+                    error=str(e)
+                ),
+            )
+
+
+    @staticmethod
+    async def update_user_premium_level(
+        user_id: str,
+        new_premium_level: int,
+        db_service: AsyncDatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en",
+        stripe_customer_id: Optional[str] = None
+        ) -> dict:
+        """Update user's premium level"""
+        try:
+            if stripe_customer_id is not None:
+                await db_service.execute_modification_query(
+                    sql="UPDATE user SET premium_level = %s, stripe_customer_id = %s WHERE id = %s",
+                    params=(new_premium_level, stripe_customer_id, user_id)
+                )
+            else:
+                await db_service.execute_modification_query(
+                    sql="UPDATE user SET premium_level = %s WHERE id = %s",
+                    params=(new_premium_level, user_id)
+                )
+            return {"detail": i18n_service.t(
+                key="api.auth.user_management.premium_level_updated",
+                locale=locale,
+                user_id=user_id,
+                new_premium_level=new_premium_level
+            )}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t(
+                    key="api.auth.user_management.premium_level_update_failed",
+                    locale=locale,
+                    user_id=user_id,
+                    error=str(e)
+                ),
+            )
@@ -134,22 +134,16 @@ class AuthService:
             locale: str = "en",
         ) -> UserInDB:
         """Authenticate a user"""
-        user = None
-        user = UserQueries.get_user_by_username(
-            username=username_or_email,
+        user = UserQueries.get_user_by_login(
+            identifier=username_or_email,
             db_service=db_service
             )
         if not user:
-            user = UserQueries.get_user_by_email(
-                email=username_or_email,
-                db_service=db_service
-                )
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail=i18n_service.t("api.auth.credentials.incorrect_credentials", locale),
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=i18n_service.t("api.auth.credentials.incorrect_credentials", locale),
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
         if not user.hashed_password:
             raise HTTPException(
@@ -211,23 +205,24 @@ class AuthService:
         UserValidators.validate_new_user(user, locale, db_service=db_service, i18n_service=i18n_service)
         hashed_password = self.get_password_hash(user.password)
         
-        UserQueries.create_user(
-            username=user.username,
-            email=user.email,
-            hashed_password=hashed_password,
-            db_service=db_service,
-            i18n_service=i18n_service,
-            locale=locale
-        )
-        
-        # Generate 6-digit verification code
-        verification_code = VerificationQueries.create_verification_code(
-            user=None,
-            email=user.email,
-            db_service=db_service,
-            i18n_service=i18n_service,
-            locale=locale
-        )
+        with db_service.transaction():
+            UserQueries.create_user(
+                username=user.username,
+                email=user.email,
+                hashed_password=hashed_password,
+                db_service=db_service,
+                i18n_service=i18n_service,
+                locale=locale
+            )
+            
+            # Generate 6-digit verification code
+            verification_code = VerificationQueries.create_verification_code(
+                user=None,
+                email=user.email,
+                db_service=db_service,
+                i18n_service=i18n_service,
+                locale=locale
+            )
         
         mail_service.send_email_verification_mail(
             recipient=user.email,
@@ -0,0 +1,256 @@
+"""
+Connection pooling for DatabaseService
+"""
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection became available within the pool timeout"""
+
+
+class PooledConnection:
+    """Proxy around a raw database connection that returns it to its pool on close()"""
+
+    def __init__(self, pool: "ConnectionPool", raw_connection: Any):
+        self._pool = pool
+        self._connection = raw_connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.checked_out = False
+        # Server-side prepared statements bound to this connection, keyed by SQL text
+        self.statement_cache: "OrderedDict[Any, Any]" = OrderedDict()
+        # Session variables set on this connection, so they are only sent when they change
+        self.session_variables: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    @property
+    def pool(self) -> "ConnectionPool":
+        """The pool this connection belongs to"""
+        return self._pool
+
+    @property
+    def raw_connection(self) -> Any:
+        """The underlying driver connection"""
+        return self._connection
+
+    def close(self) -> None:
+        """Return the connection to its pool instead of closing it"""
+        if self.checked_out:
+            self._pool.release(self)
+
+    def invalidate(self) -> None:
+        """Close the connection instead of returning it, freeing its slot in the pool"""
+        if self.checked_out:
+            self._pool.invalidate(self)
+
+    def discard(self) -> None:
+        """Close the underlying connection for good"""
+        self.statement_cache.clear()
+        try:
+            self._connection.close()
+        except Exception as err:
+            logger.debug(f"Error closing pooled connection: {err}")
+
+
+class ConnectionPool:
+    """
+    Thread-safe connection pool with overflow, pre-ping and idle recycling.
+
+    Up to `size` connections are kept open between requests. When all of them are
+    checked out, up to `max_overflow` additional connections are opened and closed
+    again on release. Callers wait up to `timeout` seconds for a free connection.
+    """
+
+    def __init__(
+            self,
+            creator: Callable[[], Any],
+            size: int = 5,
+            max_overflow: int = 10,
+            timeout: float = 30.0,
+            pre_ping: bool = True,
+            recycle: int = 3600,
+            name: str = "primary",
+            ):
+        self._creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.recycle = recycle
+        self.name = name
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._condition = threading.Condition()
+        self._total = 0
+        self._checked_out = 0
+        self._closed = False
+
+
+    def acquire(self) -> PooledConnection:
+        """Check out a connection, opening a new one if the pool has capacity left"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            pooled = None
+            with self._condition:
+                if self._closed:
+                    raise PoolTimeoutError(f"Connection pool '{self.name}' is closed")
+                while not self._idle and self._total >= self.size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No connection available in pool '{self.name}' after {self.timeout}s "
+                            f"(size={self.size}, max_overflow={self.max_overflow})"
+                        )
+                    self._condition.wait(remaining)
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._total += 1
+                self._checked_out += 1
+
+            if pooled is None:
+                try:
+                    pooled = PooledConnection(self, self._creator())
+                except Exception:
+                    self._forget()
+                    raise
+            elif not self._is_usable(pooled):
+                pooled.discard()
+                self._forget()
+                continue
+
+            pooled.checked_out = True
+            return pooled
+
+
+    def release(self, pooled: PooledConnection) -> None:
+        """Return a connection to the pool, closing it if it is broken or overflow"""
+        pooled.checked_out = False
+        pooled.last_used = time.monotonic()
+        reusable = self._reset(pooled)
+        with self._condition:
+            self._checked_out -= 1
+            if reusable and not self._closed and len(self._idle) < self.size:
+                self._idle.append(pooled)
+                self._condition.notify()
+                return
+        pooled.discard()
+        self._forget(checked_out=False)
+
+
+    def invalidate(self, pooled: PooledConnection) -> None:
+        """Close a checked out connection that cannot be reused and free its slot"""
+        pooled.checked_out = False
+        pooled.discard()
+        self._forget()
+
+
+    def dispose(self) -> None:
+        """Close all idle connections and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for pooled in idle:
+            pooled.discard()
+        logger.info(f"Connection pool '{self.name}' disposed")
+
+
+    def warm(self, count: int, prime: Optional[Callable[[PooledConnection], None]] = None) -> int:
+        """
+        Open up to `count` connections ahead of the first requests and leave them idle.
+
+        `prime` is called on every warmed connection before it is returned to the
+        pool. Returns the number of idle connections afterwards.
+        """
+        connections = []
+        try:
+            for _ in range(min(count, self.size)):
+                connections.append(self.acquire())
+            if prime is not None:
+                for pooled in connections:
+                    prime(pooled)
+        finally:
+            for pooled in connections:
+                pooled.close()
+        with self._condition:
+            return len(self._idle)
+
+
+    def wait_closed(self, timeout: float) -> bool:
+        """
+        After dispose(), wait up to `timeout` seconds for checked out connections to
+        come back and be closed. Returns False if some were still in use.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._checked_out > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+
+    @property
+    def checked_out(self) -> int:
+        """Number of connections currently in use"""
+        return self._checked_out
+
+
+    def status(self) -> Dict[str, int]:
+        """Return a snapshot of the pool counters"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._total,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+            }
+
+
+    def _forget(self, checked_out: bool = True) -> None:
+        """Drop a connection slot that no longer holds a connection"""
+        with self._condition:
+            self._total -= 1
+            if checked_out:
+                self._checked_out -= 1
+            self._condition.notify()
+
+
+    def _is_usable(self, pooled: PooledConnection) -> bool:
+        """Check an idle connection for staleness before handing it out"""
+        if self.recycle > 0 and time.monotonic() - pooled.last_used > self.recycle:
+            logger.debug(f"Recycling connection idle for more than {self.recycle}s in pool '{self.name}'")
+            return False
+        if self.pre_ping:
+            try:
+                pooled.raw_connection.ping(reconnect=False)
+            except Exception as err:
+                logger.warning(f"Discarding dead connection from pool '{self.name}': {err}")
+                return False
+        return True
+
+
+    def _reset(self, pooled: PooledConnection) -> bool:
+        """Roll back any open transaction so the next user starts clean"""
+        connection = pooled.raw_connection
+        try:
+            if getattr(connection, "in_transaction", True):
+                connection.rollback()
+            return True
+        except Exception as err:
+            logger.warning(f"Discarding connection that failed to reset in pool '{self.name}': {err}")
+            return False
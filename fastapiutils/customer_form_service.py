@@ -1,4 +1,5 @@
 import logging
+from typing import Iterator
 
 from fastapi import HTTPException, status
 
@@ -36,6 +37,8 @@ class CustomerFormService:
                 cancellation_data.termination_date
             )
         )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error creating cancellation: {e}")
             raise HTTPException(
@@ -58,6 +61,8 @@ class CustomerFormService:
                 "INSERT INTO feedback (email, text) VALUES (%s, %s)",
                 (feedback_data.email, feedback_data.text)
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error creating feedback: {e}")
             raise HTTPException(
@@ -80,6 +85,8 @@ class CustomerFormService:
                 "UPDATE cancellation SET is_archived = 1 WHERE id = %s",
                 (cancellation_id,)
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error archiving cancellation: {e}")
             raise HTTPException(
@@ -102,6 +109,8 @@ class CustomerFormService:
                 "UPDATE feedback SET is_archived = 1 WHERE id = %s",
                 (feedback_id,)
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error archiving feedback: {e}")
             raise HTTPException(
@@ -123,6 +132,8 @@ class CustomerFormService:
                 "SELECT * FROM feedback"
             )
             return [Feedback(**feedback) for feedback in feedbacks]
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error retrieving feedback: {e}")
             raise HTTPException(
@@ -143,9 +154,63 @@ class CustomerFormService:
                 "SELECT * FROM cancellation"
             )
             return [Cancellation(**cancellation) for cancellation in cancellations]
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error retrieving cancellations: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=i18n_service.t("api.customer_form.cancellation_retrieval_failed", locale)
-            )
\ No newline at end of file
+            )
+
+
+    def iter_feedbacks(
+            self,
+            db_service: DatabaseService,
+            i18n_service: I18nService,
+            locale: str = "en",
+            batch_size: int = 1000
+            ) -> Iterator[Feedback]:
+        """Stream all feedback entries without loading the whole table into memory"""
+        try:
+            rows = db_service.iter_query("SELECT * FROM feedback", batch_size=batch_size)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error retrieving feedback: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t("api.customer_form.feedback_retrieval_failed", locale)
+            )
+
+        def _feedbacks() -> Iterator[Feedback]:
+            with rows:
+                for row in rows:
+                    yield Feedback(**row)
+        return _feedbacks()
+
+
+    def iter_cancellations(
+            self,
+            db_service: DatabaseService,
+            i18n_service: I18nService,
+            locale: str = "en",
+            batch_size: int = 1000
+            ) -> Iterator[Cancellation]:
+        """Stream all cancellation entries without loading the whole table into memory"""
+        try:
+            rows = db_service.iter_query("SELECT * FROM cancellation", batch_size=batch_size)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error retrieving cancellations: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t("api.customer_form.cancellation_retrieval_failed", locale)
+            )
+
+        def _cancellations() -> Iterator[Cancellation]:
+            with rows:
+                for row in rows:
+                    yield Cancellation(**row)
+        return _cancellations()
@@ -0,0 +1,319 @@
+"""
+Database backends for DatabaseService
+
+DatabaseService talks to the database through the mysql.connector connection
+and cursor API. Each backend opens connections that provide this API and names
+the error class, schema script and features of its database.
+"""
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Type
+
+import itertools
+import logging
+import re
+import sqlite3
+
+import mysql.connector
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class MySQLBackend:
+    """MySQL through mysql-connector-python, the default backend"""
+
+    name = "mysql"
+    Error: Type[Exception] = mysql.connector.Error
+    requirements_script = "requirements.sql"
+    explain_prefix = "EXPLAIN "
+    supports_prepared_statements = True
+    supports_replicas = True
+    supports_advisory_locks = True
+    supports_statement_timeouts = True
+    supports_multi_statements = True
+    supports_read_only_sessions = True
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            user: str,
+            password: str,
+            database: str,
+            connect_timeout: Optional[int] = None,
+            read_timeout: Optional[int] = None,
+            write_timeout: Optional[int] = None,
+            ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+
+
+    def connect(self, host: Optional[str] = None, port: Optional[int] = None):
+        """Open a new connection to the primary database or the given host"""
+        timeouts = {}
+        if self.connect_timeout:
+            timeouts["connection_timeout"] = self.connect_timeout
+        if self.read_timeout:
+            timeouts["read_timeout"] = self.read_timeout
+        if self.write_timeout:
+            timeouts["write_timeout"] = self.write_timeout
+        return mysql.connector.connect(
+            host=host or self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            port=port or self.port,
+            **timeouts
+        )
+
+
+    def connect_read_only(self, host: Optional[str] = None, port: Optional[int] = None, isolation_level: str = "READ COMMITTED"):
+        """
+        Open an autocommit connection whose session only allows reads, so every
+        SELECT runs as its own short read-only transaction
+        """
+        connection = self.connect(host=host, port=port)
+        try:
+            connection.autocommit = True
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"SET SESSION TRANSACTION ISOLATION LEVEL {isolation_level}")
+                cursor.execute("SET SESSION TRANSACTION READ ONLY")
+            finally:
+                cursor.close()
+        except mysql.connector.Error:
+            connection.close()
+            raise
+        return connection
+
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteError(Exception):
+    """
+    sqlite3 error carrying the MySQL error number of its closest MySQL equivalent,
+    so the retry and duplicate-key handling of DatabaseService applies unchanged
+    """
+
+    def __init__(self, msg: str, errno: Optional[int] = None):
+        super().__init__(msg)
+        self.msg = msg
+        self.errno = errno
+
+
+_UNIQUE_FAILED_PREFIX = "UNIQUE constraint failed: "
+
+
+def _duplicate_key_name(message: str, connection: Optional[sqlite3.Connection]) -> str:
+    """
+    Return the MySQL style key name of a "UNIQUE constraint failed: table.column"
+    message, "table.PRIMARY" if the columns are the table's primary key
+    """
+    columns = [column.split(".", 1) for column in message[len(_UNIQUE_FAILED_PREFIX):].split(", ")]
+    table = columns[0][0]
+    if connection is not None:
+        try:
+            primary_key = {row[1] for row in connection.execute(f"PRAGMA table_info(`{table}`)") if row[5]}
+        except sqlite3.Error:
+            primary_key = set()
+        if primary_key and primary_key == {column[-1] for column in columns}:
+            return f"{table}.PRIMARY"
+    return f"{table}.{columns[0][-1]}"
+
+
+def _to_sqlite_error(err: sqlite3.Error, connection: Optional[sqlite3.Connection] = None) -> SQLiteError:
+    message = str(err)
+    errno = None
+    if message.startswith("no such table"):
+        errno = 1146  # ER_NO_SUCH_TABLE
+    elif message.startswith(_UNIQUE_FAILED_PREFIX):
+        errno = 1062  # ER_DUP_ENTRY
+        # Name the key like MySQL does, so is_duplicate_key_error(err, "PRIMARY") matches
+        message = f"{message} for key '{_duplicate_key_name(message, connection)}'"
+    elif "locked" in message or "busy" in message:
+        errno = 1205  # ER_LOCK_WAIT_TIMEOUT, the statement was not applied
+    return SQLiteError(message, errno)
+
+
+@lru_cache(maxsize=1024)
+def translate_sql(sql: str) -> str:
+    """Translate %s placeholders of the MySQL driver into SQLite's ? placeholders"""
+    return re.sub(r"%(s|%)", lambda match: "?" if match.group(1) == "s" else "%", sql)
+
+
+def _adapt_datetime(value: datetime) -> str:
+    # Store UTC without offset, like MySQL timestamps read back through mysql.connector
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(sep=" ")
+
+
+def _convert_timestamp(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+def _convert_date(value: bytes) -> date:
+    return date.fromisoformat(value.decode())
+
+
+class SQLiteCursor:
+    """mysql.connector style cursor on top of a sqlite3 cursor"""
+
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool):
+        self._cursor = cursor
+        if dictionary:
+            cursor.row_factory = lambda c, row: dict(zip([column[0] for column in c.description], row))
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        try:
+            self._cursor.execute(translate_sql(sql), tuple(params))
+        except sqlite3.Error as err:
+            raise _to_sqlite_error(err, self._cursor.connection) from err
+
+    def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
+        try:
+            self._cursor.executemany(translate_sql(sql), seq_of_params)
+        except sqlite3.Error as err:
+            raise _to_sqlite_error(err, self._cursor.connection) from err
+
+    def fetchone(self) -> Any:
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int) -> list:
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self) -> list:
+        return self._cursor.fetchall()
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """mysql.connector style connection on top of a sqlite3 connection"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection.in_transaction
+
+    def cursor(self, dictionary: bool = False, buffered: bool = True, prepared: bool = False) -> SQLiteCursor:
+        # sqlite3 caches compiled statements itself and always reads rows lazily
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def commit(self) -> None:
+        try:
+            self._connection.commit()
+        except sqlite3.Error as err:
+            raise _to_sqlite_error(err) from err
+
+    def rollback(self) -> None:
+        try:
+            self._connection.rollback()
+        except sqlite3.Error as err:
+            raise _to_sqlite_error(err) from err
+
+    def ping(self, reconnect: bool = False) -> None:
+        try:
+            self._connection.execute("SELECT 1")
+        except sqlite3.Error as err:
+            raise _to_sqlite_error(err) from err
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class SQLiteBackend:
+    """
+    In-process SQLite stand-in for MySQL, for benchmarks, load tests and CI.
+
+    `path` is a database file or ":memory:". In-memory databases use a shared
+    cache that a connection held by the backend keeps alive, so every pooled
+    connection sees the same data until close() is called.
+    """
+
+    name = "sqlite"
+    Error: Type[Exception] = SQLiteError
+    requirements_script = "requirements.sqlite.sql"
+    explain_prefix = "EXPLAIN QUERY PLAN "
+    supports_prepared_statements = False
+    supports_replicas = False
+    supports_advisory_locks = False
+    supports_statement_timeouts = False
+    supports_multi_statements = False
+    supports_read_only_sessions = False
+
+    _memory_database_ids = itertools.count()
+    _converters_registered = False
+
+    def __init__(self, path: str = ":memory:", busy_timeout: float = 30.0):
+        self._register_converters()
+        self.busy_timeout = busy_timeout
+        if path == ":memory:":
+            self.database = f"file:fastapiutils_{next(self._memory_database_ids)}?mode=memory&cache=shared"
+            self._uri = True
+        else:
+            self.database = path
+            self._uri = False
+        # Keeps an in-memory database alive and switches file databases to WAL once
+        self._anchor = self._open()
+        if not self._uri:
+            self._anchor.execute("PRAGMA journal_mode=WAL")
+
+
+    @classmethod
+    def _register_converters(cls) -> None:
+        if cls._converters_registered:
+            return
+        sqlite3.register_adapter(datetime, _adapt_datetime)
+        sqlite3.register_adapter(date, lambda value: value.isoformat())
+        sqlite3.register_converter("timestamp", _convert_timestamp)
+        sqlite3.register_converter("date", _convert_date)
+        cls._converters_registered = True
+
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.database,
+            uri=self._uri,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # pooled connections move between worker threads
+        )
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+
+    def connect(self, host: Optional[str] = None, port: Optional[int] = None) -> SQLiteConnection:
+        """Open a new connection to the database, host and port are ignored"""
+        try:
+            return SQLiteConnection(self._open())
+        except sqlite3.Error as err:
+            raise _to_sqlite_error(err) from err
+
+
+    def close(self) -> None:
+        """Close the anchor connection, which drops an in-memory database"""
+        self._anchor.close()
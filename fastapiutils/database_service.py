@@ -1,17 +1,196 @@
-import mysql.connector
-import uuid
+import itertools
+import math
+import re
+import threading
+import time
 import os
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional, Dict, Any, AsyncIterator, List, Sequence, Tuple, Type, TypeVar, Callable, FrozenSet, Iterable, Iterator
+
+from .ids import new_id
+from .database_backends import MySQLBackend, SQLiteBackend
+from .db_executor import DatabaseExecutor
+from .last_seen import LastSeenBuffer
+from .connection_pool import ConnectionPool, PooledConnection, PoolTimeoutError
+from .query_cache import ObjectCache, QueryCache, written_table
+from .query_metrics import QueryMetrics
+from .resilience import CONNECTION_ERRNOS, READ_RETRY_ERRNOS, TIMEOUT_ERRNOS, WRITE_RETRY_ERRNOS, CircuitBreaker, DatabaseTimeoutError, DatabaseUnavailableError, RetryPolicy
+from .row_mapping import ModelT, column_names, get_row_mapper
+from .schema_manager import SchemaManager
 
 logger = logging.getLogger('uvicorn.error')
 
+T = TypeVar("T")
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean flag from an environment variable value"""
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+_INSERT_VALUES_PATTERN = re.compile(
+    r"^\s*(INSERT\s+(?:IGNORE\s+)?INTO\s+.+?\s+VALUES)\s*(\(.*?\))\s*(ON\s+DUPLICATE\s+KEY\s+UPDATE\s+.*?)?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def rewrite_multi_row_insert(sql: str, batch: List[Tuple]) -> Optional[Tuple[str, Tuple]]:
+    """
+    Rewrite a single-row `INSERT ... VALUES (...)` into one multi-row INSERT for a batch.
+
+    Returns the rewritten SQL with the flattened parameters, or None if the
+    statement is not a simple INSERT that can be rewritten. That includes an
+    `ON DUPLICATE KEY UPDATE` clause with placeholders, whose parameters are
+    part of every row but would appear only once in the rewritten SQL.
+    """
+    match = _INSERT_VALUES_PATTERN.match(sql)
+    if match is None:
+        return None
+    head, row, on_duplicate = match.groups()
+    if on_duplicate and "%s" in on_duplicate:
+        return None
+    rewritten = f"{head} {', '.join([row] * len(batch))}"
+    if on_duplicate:
+        rewritten += f" {on_duplicate}"
+    return rewritten, tuple(value for params in batch for value in params)
+
+
+def is_duplicate_key_error(err: Exception, key: Optional[str] = None) -> bool:
+    """
+    Check whether a driver error is a duplicate-key violation (MySQL error 1062).
+
+    If `key` is given, only violations of that index count, e.g. "PRIMARY".
+    Works for mysql.connector, aiomysql and SQLite backend errors.
+    """
+    errno = getattr(err, "errno", None)
+    if errno is None and getattr(err, "args", None):
+        errno = err.args[0]
+    if errno != 1062:
+        return False
+    # MySQL 8 reports "for key 'table.PRIMARY'", older versions "for key 'PRIMARY'"
+    return key is None or f".{key}'" in str(err) or f"'{key}'" in str(err)
+
+
+ISOLATION_LEVELS = ("READ UNCOMMITTED", "READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE")
+
+_SELECT_PATTERN = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def with_max_execution_time(sql: str, timeout_ms: int) -> str:
+    """Add a MAX_EXECUTION_TIME optimizer hint to a SELECT statement"""
+    match = _SELECT_PATTERN.match(sql)
+    if match is None or "MAX_EXECUTION_TIME" in sql.upper():
+        return sql
+    return f"{sql[:match.end()]} /*+ MAX_EXECUTION_TIME({timeout_ms}) */{sql[match.end():]}"
+
+
+def _batches(seq_of_params: Iterable[Tuple], batch_size: int) -> Iterator[List[Tuple]]:
+    """Split a parameter sequence into lists of at most batch_size entries"""
+    batch: List[Tuple] = []
+    for params in seq_of_params:
+        batch.append(tuple(params))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class RowIterator:
+    """
+    Iterator over an unbuffered cursor that fetches rows in batches.
+
+    The connection is released as soon as all rows were read. If iteration stops
+    early, close() (or garbage collection) closes the connection instead, because
+    the unread rows would otherwise have to be drained from the server.
+    """
+
+    def __init__(self, connection, cursor, batch_size: int, release: Callable[[Any, bool], None]):
+        self._connection = connection
+        self._cursor = cursor
+        self._batch_size = batch_size
+        self._release = release
+        self._batch: List[Any] = []
+        self._position = 0
+        self._closed = False
+
+    def __iter__(self) -> "RowIterator":
+        return self
 
-class DatabaseService:
-    """Database manager for MySQL operations"""
+    def __next__(self) -> Any:
+        if self._position >= len(self._batch):
+            if self._closed:
+                raise StopIteration
+            self._batch = self._cursor.fetchmany(self._batch_size)
+            self._position = 0
+            if not self._batch:
+                self._finish(exhausted=True)
+                raise StopIteration
+        row = self._batch[self._position]
+        self._position += 1
+        return row
+
+    def __enter__(self) -> "RowIterator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop iterating and give up the connection"""
+        self._finish(exhausted=False)
+
+    def _finish(self, exhausted: bool) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._batch = []
+        if exhausted:
+            self._cursor.close()
+        self._release(self._connection, exhausted)
+
+
+class _RequestScope:
+    """Connection bound to one request, checked out on first use, and the time of its last write"""
+
+    __slots__ = ("connection", "closed", "last_write_at")
+
+    def __init__(self):
+        self.connection = None
+        self.closed = False
+        self.last_write_at = None
+
+
+class BaseDatabaseService:
+    """Connection settings shared by the sync and async database services"""
     
     def __init__(self):
-        """Initialize the database manager with environment variables"""
+        """Read the connection and pool settings from environment variables"""
+        self.backend_name = self._get_env_setting("DB_BACKEND", "mysql").lower()
+        if self.backend_name == "sqlite":
+            self.sqlite_path = self._get_env_setting("DB_SQLITE_PATH", ":memory:")
+        elif self.backend_name == "mysql":
+            self._read_mysql_settings()
+        else:
+            logger.error(f"Unknown database backend '{self.backend_name}' in 'DB_BACKEND'")
+            raise ValueError("DB_BACKEND must be 'mysql' or 'sqlite'")
+
+        self.pool_size = self._get_env_setting("DB_POOL_SIZE", 5, int)
+        self.pool_max_overflow = self._get_env_setting("DB_POOL_MAX_OVERFLOW", 10, int)
+        self.pool_timeout = self._get_env_setting("DB_POOL_TIMEOUT", 30.0, float)
+        self.pool_pre_ping = self._get_env_setting("DB_POOL_PRE_PING", True, _parse_bool)
+        self.pool_recycle = self._get_env_setting("DB_POOL_RECYCLE", 3600, int)
+
+
+    def _read_mysql_settings(self) -> None:
+        """Read the MySQL connection settings from environment variables"""
         if "DB_HOST" in os.environ:
             self.host = os.environ["DB_HOST"]
             logger.info(f"Using database host '{self.host}' from environment variable 'DB_HOST'")
@@ -47,13 +226,102 @@ class DatabaseService:
             logger.error("Environment variable DB_NAME not set, cannot connect to database")
             raise ValueError("DB_NAME environment variable is required")
 
-        logger.info("DatabaseService initialized. Executing requirements.sql...")
-        self.execute_requirements_sql()
+
+    def _get_env_setting(self, name: str, default: Any, cast: Callable[[str], Any] = str) -> Any:
+        """Read an optional setting from the environment, falling back to a default"""
+        if name in os.environ:
+            value = cast(os.environ[name])
+            logger.info(f"Using '{value}' from environment variable '{name}'")
+            return value
+        logger.info(f"Using default '{default}' since '{name}' not set")
+        return default
+
+
+class DatabaseService(BaseDatabaseService):
+    """Database manager for MySQL operations, or SQLite with DB_BACKEND=sqlite"""
+    
+    def __init__(self):
+        """Initialize the database manager with environment variables"""
+        super().__init__()
+        self.backend = self._create_backend()
+        self.pool = self._create_pool()
+        self._transaction_connection: ContextVar = ContextVar(f"db_transaction_{id(self)}", default=None)
+        self._request_scope: ContextVar = ContextVar(f"db_request_scope_{id(self)}", default=None)
+        self._init_read_only_pool()
+        self._init_replicas()
+
+        self.use_prepared_statements = self._get_env_setting("DB_PREPARED_STATEMENTS", False, _parse_bool)
+        self.prepared_statement_cache_size = self._get_env_setting("DB_PREPARED_STATEMENT_CACHE_SIZE", 64, int)
+        if self.use_prepared_statements and not self.backend.supports_prepared_statements:
+            logger.warning(f"Ignoring 'DB_PREPARED_STATEMENTS' since the {self.backend.name} backend does not support them")
+            self.use_prepared_statements = False
+        if self.use_prepared_statements and self.pool is None:
+            logger.warning("Prepared statements are only cached on pooled connections, set 'DB_POOL_SIZE' above 0")
+        self._statement_stats_lock = threading.Lock()
+        self._statement_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        explain_slow_queries = self._get_env_setting("DB_SLOW_QUERY_EXPLAIN", False, _parse_bool)
+        self.query_metrics = QueryMetrics(
+            slow_query_ms=self._get_env_setting("DB_SLOW_QUERY_MS", 500.0, float),
+            explain=self._explain if explain_slow_queries else None,
+        )
+
+        self.query_timeout_ms = self._get_env_setting("DB_QUERY_TIMEOUT_MS", 0, int)
+        self.stream_timeout_ms = self._get_env_setting("DB_STREAM_TIMEOUT_MS", 0, int)
+        self.lock_wait_timeout = self._get_env_setting("DB_LOCK_WAIT_TIMEOUT", 0, int)
+        if (self.query_timeout_ms or self.stream_timeout_ms or self.lock_wait_timeout) and not self.backend.supports_statement_timeouts:
+            logger.warning(f"Ignoring statement timeouts since the {self.backend.name} backend does not support them")
+
+        query_cache_size = self._get_env_setting("DB_QUERY_CACHE_SIZE", 0, int)
+        self.query_cache = QueryCache(
+            max_size=query_cache_size,
+            ttl=self._get_env_setting("DB_QUERY_CACHE_TTL", 5.0, float),
+        ) if query_cache_size > 0 else None
+        user_cache_size = self._get_env_setting("DB_USER_CACHE_SIZE", 0, int)
+        self.user_cache = ObjectCache(
+            max_size=user_cache_size,
+            ttl=self._get_env_setting("DB_USER_CACHE_TTL", 30.0, float),
+        ) if user_cache_size > 0 else None
+        last_seen_flush_interval = self._get_env_setting("DB_LAST_SEEN_FLUSH_INTERVAL", 0.0, float)
+        self.last_seen_buffer = LastSeenBuffer(
+            db_service=self,
+            flush_interval=last_seen_flush_interval,
+            max_size=self._get_env_setting("DB_LAST_SEEN_BUFFER_SIZE", 1000, int),
+        ) if last_seen_flush_interval > 0 else None
+        self._transaction_writes: ContextVar = ContextVar(f"db_transaction_writes_{id(self)}", default=None)
+
+        self.executor = DatabaseExecutor(
+            max_workers=self._get_env_setting("DB_EXECUTOR_WORKERS", max(self.pool_size + self.pool_max_overflow, 1), int),
+            max_queue=self._get_env_setting("DB_EXECUTOR_MAX_QUEUE", 0, int),
+        )
+
+        self.retry_policy = RetryPolicy(
+            max_attempts=self._get_env_setting("DB_RETRY_ATTEMPTS", 3, int),
+            backoff_base=self._get_env_setting("DB_RETRY_BACKOFF_BASE", 0.05, float),
+            backoff_max=self._get_env_setting("DB_RETRY_BACKOFF_MAX", 1.0, float),
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=self._get_env_setting("DB_CIRCUIT_BREAKER_THRESHOLD", 5, int),
+            reset_timeout=self._get_env_setting("DB_CIRCUIT_BREAKER_RESET_SECONDS", 30.0, float),
+        )
+
+        logger.info("DatabaseService initialized. Checking database schema...")
+        self.ensure_schema()
+
+
+    def ensure_schema(self) -> None:
+        """Apply requirements.sql and pending migrations unless the recorded schema version is current"""
+        schema_manager = SchemaManager(
+            create_connection=self.create_connection,
+            lock_timeout=self._get_env_setting("DB_SCHEMA_LOCK_TIMEOUT", 60, int),
+            backend=self.backend,
+        )
+        schema_manager.ensure_schema()
 
 
     def execute_requirements_sql(self):
-        """Execute the requirements.sql file to set up the database schema"""
-        requirements_file = os.path.join(os.path.dirname(__file__), 'requirements.sql')
+        """Execute the requirements.sql file unconditionally, bypassing the schema version check"""
+        requirements_file = os.path.join(os.path.dirname(__file__), self.backend.requirements_script)
         if not os.path.exists(requirements_file):
             logger.error(f"Requirements file '{requirements_file}' does not exist")
             raise FileNotFoundError(f"Requirements file '{requirements_file}' not found")
@@ -69,60 +337,722 @@ class DatabaseService:
                     cursor.execute(statement)
             connection.commit()
             logger.info("Database schema updated successfully")
-        except mysql.connector.Error as err:
-            logger.error(f"Error executing requirements.sql: {err}")
+        except self.backend.Error as err:
+            logger.error(f"Error executing {self.backend.requirements_script}: {err}")
             raise
         finally:
             cursor.close()
             connection.close()
 
-    def create_connection(self):
-        """Creates and returns a connection to the database"""
-        return mysql.connector.connect(
+    def _create_backend(self):
+        """Create the backend selected by DB_BACKEND"""
+        if self.backend_name == "sqlite":
+            return SQLiteBackend(self.sqlite_path)
+        return MySQLBackend(
             host=self.host,
+            port=self.port,
             user=self.user,
             password=self.password,
             database=self.database,
-            port=self.port
+            connect_timeout=self._get_env_setting("DB_CONNECT_TIMEOUT", 10, int),
+            read_timeout=self._get_env_setting("DB_NET_READ_TIMEOUT", 0, int),
+            write_timeout=self._get_env_setting("DB_NET_WRITE_TIMEOUT", 0, int),
         )
 
 
-    def execute_query(self, sql: str, params: Optional[Tuple] = None, dictionary: bool = True, connection=None) -> Optional[List[Dict[str, Any]]]:
+    def _create_pool(self, host: Optional[str] = None, port: Optional[int] = None, name: str = "primary", read_only: bool = False) -> Optional[ConnectionPool]:
+        """Create a connection pool from the DB_POOL_* settings"""
+        if self.pool_size <= 0:
+            logger.warning("Connection pooling disabled, opening a new connection per query")
+            return None
+
+        return ConnectionPool(
+            creator=lambda: self._connect(host=host, port=port, read_only=read_only),
+            size=self.pool_size,
+            max_overflow=self.pool_max_overflow,
+            timeout=self.pool_timeout,
+            pre_ping=self.pool_pre_ping,
+            recycle=self.pool_recycle,
+            name=name,
+        )
+
+
+    def _init_read_only_pool(self) -> None:
+        """Create the pool of autocommit read-only primary connections enabled by DB_READ_ONLY_CONNECTIONS"""
+        self.read_only_pool: Optional[ConnectionPool] = None
+        self.read_only_connections = self._get_env_setting("DB_READ_ONLY_CONNECTIONS", False, _parse_bool)
+        self.read_isolation_level = self._get_env_setting("DB_READ_ISOLATION_LEVEL", "READ COMMITTED").upper().replace("-", " ")
+        if self.read_isolation_level not in ISOLATION_LEVELS:
+            logger.error(f"Unknown isolation level '{self.read_isolation_level}' in 'DB_READ_ISOLATION_LEVEL'")
+            raise ValueError(f"DB_READ_ISOLATION_LEVEL must be one of {', '.join(ISOLATION_LEVELS)}")
+
+        if not self.read_only_connections:
+            return
+        if self.pool is None:
+            logger.warning("Ignoring 'DB_READ_ONLY_CONNECTIONS' since read-only connections require connection pooling")
+            self.read_only_connections = False
+            return
+        if not self.backend.supports_read_only_sessions:
+            logger.warning(f"Ignoring 'DB_READ_ONLY_CONNECTIONS' since the {self.backend.name} backend does not support them")
+            self.read_only_connections = False
+            return
+        self.read_only_pool = self._create_pool(name="primary read-only", read_only=True)
+        logger.info(f"Running reads on autocommit read-only connections with {self.read_isolation_level}")
+
+
+    def _init_replicas(self) -> None:
+        """Create one pool per read replica listed in DB_REPLICA_HOSTS"""
+        self.replica_pools: List[ConnectionPool] = []
+        self.replica_strategy = self._get_env_setting("DB_REPLICA_STRATEGY", "round_robin")
+        self.read_your_writes_seconds = self._get_env_setting("DB_READ_YOUR_WRITES_SECONDS", 5.0, float)
+        self._replica_counter = itertools.count()
+        self._last_write_at: ContextVar = ContextVar(f"db_last_write_{id(self)}", default=None)
+
+        replica_hosts = self._get_env_setting("DB_REPLICA_HOSTS", "")
+        if not replica_hosts.strip():
+            return
+        if self.pool is None:
+            logger.warning("Ignoring 'DB_REPLICA_HOSTS' since read replicas require connection pooling")
+            return
+        if not self.backend.supports_replicas:
+            logger.warning(f"Ignoring 'DB_REPLICA_HOSTS' since the {self.backend.name} backend has no replicas")
+            return
+        if self.replica_strategy not in ("round_robin", "least_connections"):
+            logger.warning(f"Unknown replica strategy '{self.replica_strategy}', using 'round_robin'")
+            self.replica_strategy = "round_robin"
+
+        for replica in replica_hosts.split(","):
+            host, _, port = replica.strip().partition(":")
+            port = int(port) if port else self.port
+            self.replica_pools.append(self._create_pool(host=host, port=port, name=f"replica {host}:{port}", read_only=self.read_only_connections))
+            logger.info(f"Routing reads to replica '{host}:{port}'")
+
+
+    def _connect(self, host: Optional[str] = None, port: Optional[int] = None, read_only: bool = False):
+        """Open a new, unpooled connection to the primary database or the given host"""
+        try:
+            if read_only:
+                connection = self.backend.connect_read_only(host=host, port=port, isolation_level=self.read_isolation_level)
+            else:
+                connection = self.backend.connect(host=host, port=port)
+        except self.backend.Error as err:
+            if host is None and err.errno in CONNECTION_ERRNOS:
+                self.circuit_breaker.record_failure()
+            raise
+        if host is None:
+            self.circuit_breaker.record_success()
+        return connection
+
+
+    def create_connection(self):
+        """
+        Creates and returns a connection to the database.
+
+        When pooling is enabled the connection is checked out from the pool and
+        calling close() on it returns it to the pool. Raises DatabaseUnavailableError
+        while the circuit breaker is open or when no pooled connection became free
+        within DB_POOL_TIMEOUT.
+        """
+        self.circuit_breaker.before_call()
+        if self.pool is not None:
+            return self._acquire(self.pool)
+        return self._connect()
+
+
+    def create_read_connection(self):
+        """
+        Returns a connection for read-only queries.
+
+        Reads go to a read replica chosen by DB_REPLICA_STRATEGY, unless no replicas
+        are configured or the current request wrote to the primary within the last
+        DB_READ_YOUR_WRITES_SECONDS. Falls back to the primary if the replica is
+        unreachable. With DB_READ_ONLY_CONNECTIONS, reads on the primary use its
+        autocommit read-only pool.
+        """
+        if not self.replica_pools or self._recently_wrote():
+            return self._create_primary_read_connection()
+
+        if self.replica_strategy == "least_connections":
+            replica_pool = min(self.replica_pools, key=lambda pool: pool.checked_out)
+        else:
+            replica_pool = self.replica_pools[next(self._replica_counter) % len(self.replica_pools)]
+        try:
+            return replica_pool.acquire()
+        except (self.backend.Error, PoolTimeoutError) as err:
+            logger.warning(f"Reading from primary since {replica_pool.name} is unavailable: {err}")
+            return self._create_primary_read_connection()
+
+
+    def _create_primary_read_connection(self):
+        """Check out a read-only primary connection if enabled, otherwise a regular one"""
+        if self.read_only_pool is None:
+            return self.create_connection()
+        self.circuit_breaker.before_call()
+        return self._acquire(self.read_only_pool)
+
+
+    def _acquire(self, pool: ConnectionPool) -> PooledConnection:
+        """Check out a pooled connection, answering an exhausted pool with 503 instead of 500"""
+        try:
+            return pool.acquire()
+        except PoolTimeoutError as err:
+            logger.warning(str(err))
+            raise DatabaseUnavailableError(retry_after=1) from err
+
+
+    def _mark_write(self) -> None:
+        """Pin reads of the current request to the primary for the read-your-writes window"""
+        if not self.replica_pools:
+            return
+        # The scope is shared by the copied contexts of db_service.run(), a ContextVar set in one is not
+        scope = self._request_scope.get()
+        if scope is not None:
+            scope.last_write_at = time.monotonic()
+        else:
+            self._last_write_at.set(time.monotonic())
+
+
+    def _recently_wrote(self) -> bool:
+        scope = self._request_scope.get()
+        last_write_at = scope.last_write_at if scope is not None else self._last_write_at.get()
+        return last_write_at is not None and time.monotonic() - last_write_at < self.read_your_writes_seconds
+
+
+    def get_pool_status(self) -> Dict[str, Any]:
+        """Return the counters of the primary pool and of every replica pool"""
+        return {
+            "primary": self.pool.status() if self.pool is not None else None,
+            "read_only": self.read_only_pool.status() if self.read_only_pool is not None else None,
+            "replicas": {pool.name: pool.status() for pool in self.replica_pools},
+        }
+
+
+    def _pools(self) -> List[ConnectionPool]:
+        """The primary pools followed by the replica pools"""
+        primary_pools = [pool for pool in (self.pool, self.read_only_pool) if pool is not None]
+        return primary_pools + self.replica_pools
+
+
+    def close(self) -> None:
+        """Write buffered last_seen timestamps and close all pooled connections"""
+        if self.last_seen_buffer is not None:
+            self.last_seen_buffer.close()
+        for pool in self._pools():
+            pool.dispose()
+        self.backend.close()
+
+
+    def startup(self, warm_connections: Optional[int] = None, statements: Iterable[Tuple[str, Optional[Tuple]]] = ()) -> None:
+        """
+        Get the service ready for traffic before the first request arrives.
+
+        Opens `warm_connections` connections (default DB_POOL_SIZE) in the primary
+        and every replica pool and checks each one with SELECT 1. `statements` are
+        (sql, params) pairs of hot reads that are then run on every warmed
+        connection, which prepares them in prepared statement mode and fills the
+        SQL rewrite caches. They are run like execute_query, with a dictionary
+        cursor. Failures are logged, the service still starts.
+        """
+        statements = list(statements)
+        count = self.pool_size if warm_connections is None else warm_connections
+        if count <= 0:
+            return
+
+        started = time.perf_counter()
+        try:
+            if self.pool is None:
+                connection = self.create_connection()
+                try:
+                    self._prime_connection(connection, statements)
+                finally:
+                    connection.close()
+            for pool in self._pools():
+                idle = pool.warm(count, lambda connection: self._prime_connection(connection, statements))
+                logger.info(f"Pool '{pool.name}' warmed up with {idle} idle connection(s)")
+        except (self.backend.Error, PoolTimeoutError) as err:
+            logger.warning(f"Warming up database connections failed: {err}")
+            return
+        logger.info(f"Database warm-up with {len(statements)} statement(s) took {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+    def _prime_connection(self, connection, statements: List[Tuple[str, Optional[Tuple]]]) -> None:
+        """Ping a fresh connection and run the warm-up statements on it"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        for sql, params in statements:
+            query = self._with_read_timeout(sql, self.query_timeout_ms)
+            self._fetch_all(connection, query, params, True, sql)
+
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain and close all pools.
+
+        Buffered last_seen timestamps are written first. Then the executor stops
+        accepting calls, new checkouts are refused right away, idle connections
+        are closed and connections still in use are closed as they are returned,
+        for at most `timeout` seconds (default DB_POOL_TIMEOUT).
+        """
+        timeout = self.pool_timeout if timeout is None else timeout
+        if self.last_seen_buffer is not None:
+            self.last_seen_buffer.close(timeout)
+        self.executor.shutdown()
+        pools = self._pools()
+        for pool in pools:
+            pool.dispose()
+        deadline = time.monotonic() + timeout
+        for pool in pools:
+            if not pool.wait_closed(max(0.0, deadline - time.monotonic())):
+                logger.warning(f"{pool.checked_out} connection(s) of pool '{pool.name}' still in use after {timeout}s")
+        self.backend.close()
+        logger.info("DatabaseService shut down")
+
+
+    def get_prepared_statement_stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters of the prepared statement cache"""
+        with self._statement_stats_lock:
+            return dict(self._statement_stats)
+
+
+    def _count_statement(self, counter: str) -> None:
+        with self._statement_stats_lock:
+            self._statement_stats[counter] += 1
+
+
+    def get_circuit_breaker_status(self) -> Dict[str, Any]:
+        """Return the state and consecutive failure count of the circuit breaker"""
+        return self.circuit_breaker.status()
+
+
+    def get_query_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return latency, row and error statistics per normalized SQL statement"""
+        return self.query_metrics.snapshot()
+
+
+    def get_executor_status(self) -> Dict[str, Any]:
+        """Return queue depth, busy threads, saturation and wait time of the database executor"""
+        return self.executor.status()
+
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Await a blocking call that uses this service from async code.
+
+        The call runs on the bounded database executor instead of the event loop,
+        in a copy of the current context, so it joins the request's
+        request_scope() and transaction(). Calls of one request must be awaited
+        one after another, since they may share the request's connection.
+
+        Usage:
+            user = await db_service.run(UserQueries.get_user_by_id, user_id, db_service)
+
+        Raises:
+            DatabaseUnavailableError: If DB_EXECUTOR_MAX_QUEUE calls are already waiting
+        """
+        return await self.executor.run(func, *args, **kwargs)
+
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """
+        Consume a blocking iterator, such as one reading from iter_query(), on the
+        database executor, e.g. to stream it with a StreamingResponse.
+
+        Every item is one executor call, so iterate over chunks rather than rows,
+        for example the output of stream_json_array(). The iterator is closed on
+        the executor when iteration ends or is abandoned.
+        """
+        exhausted = object()
+        try:
+            while True:
+                item = await self.executor.run(next, iterator, exhausted)
+                if item is exhausted:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await self.executor.run_cleanup(close)
+
+
+    def get_query_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return hit, miss, eviction and invalidation counters of the query cache, None if disabled"""
+        return self.query_cache.stats() if self.query_cache is not None else None
+
+
+    def get_user_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return hit, miss, eviction and invalidation counters of the user cache, None if disabled"""
+        return self.user_cache.stats() if self.user_cache is not None else None
+
+
+    def get_last_seen_stats(self) -> Optional[Dict[str, Any]]:
+        """Return pending users and flush counters of the last_seen buffer, None if disabled"""
+        return self.last_seen_buffer.stats() if self.last_seen_buffer is not None else None
+
+
+    def get_cached_user(self, user_id: str, load: Callable[[], Optional[ModelT]]) -> Optional[ModelT]:
+        """
+        Return a copy of the cached user with `user_id`, or `load()` it and cache the result.
+
+        Inside transaction() the cache is bypassed, so uncommitted rows are never
+        cached. Users that do not exist are not cached.
+        """
+        if self.user_cache is None or self._transaction_connection.get() is not None:
+            return load()
+        user = self.user_cache.get(user_id)
+        if user is None:
+            epoch = self.user_cache.epoch()
+            user = load()
+            if user is None:
+                return None
+            self.user_cache.set(user_id, user, epoch)
+        return user.model_copy()
+
+
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop a user from the user cache after writing their row. Inside
+        transaction() the user is dropped again on commit, since reads on other
+        connections may cache the old row until then.
+        """
+        if self.user_cache is None:
+            return
+        self.user_cache.invalidate(user_id)
+        pending = self._transaction_writes.get()
+        if pending is not None:
+            pending.add((self.user_cache, user_id))
+
+
+    def _invalidate_cache(self, sql: str) -> None:
+        """
+        Outdate cached results of the table `sql` writes to. Inside transaction()
+        the table is outdated again on commit, since reads on other connections
+        may cache the old rows until then.
+        """
+        if self.query_cache is None:
+            return
+        table = written_table(sql)
+        self.query_cache.invalidate(table)
+        pending = self._transaction_writes.get()
+        if pending is not None:
+            pending.add((self.query_cache, table))
+
+
+    def _explain(self, sql: str, params: Optional[Tuple]) -> List[Dict[str, Any]]:
+        """Run EXPLAIN for a slow SELECT on a separate connection"""
+        connection = self.create_read_connection()
+        try:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(self.backend.explain_prefix + sql, params or ())
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            connection.close()
+
+
+    def _get_cursor(self, connection, sql: str, dictionary: bool) -> Tuple[Any, str, bool]:
+        """
+        Return (cursor, sql, cached) for executing `sql` on `connection`.
+
+        In prepared statement mode, pooled connections keep one prepared cursor per
+        SQL text in an LRU cache. The returned sql is the exact string object the
+        cursor was prepared with, which the driver needs to skip re-preparing it.
+        Cached cursors must not be closed by the caller.
+        """
+        if not self.use_prepared_statements or not isinstance(connection, PooledConnection):
+            return connection.cursor(dictionary=dictionary), sql, False
+
+        cache = connection.statement_cache
+        key = (sql, dictionary)
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            self._count_statement("hits")
+            return entry[0], entry[1], True
+
+        self._count_statement("misses")
+        cursor = connection.cursor(prepared=True, dictionary=dictionary)
+        cache[key] = (cursor, sql)
+        while len(cache) > self.prepared_statement_cache_size:
+            _, (evicted_cursor, _) = cache.popitem(last=False)
+            evicted_cursor.close()  # Deallocates the statement on the server
+            self._count_statement("evictions")
+        return cursor, sql, True
+
+
+    def _evict_cursor(self, connection, sql: str, dictionary: bool) -> None:
+        """Drop a cached prepared cursor after it failed, so the next call prepares it again"""
+        entry = connection.statement_cache.pop((sql, dictionary), None)
+        if entry is not None:
+            try:
+                entry[0].close()
+            except self.backend.Error:
+                pass
+
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """
+        Share one connection between all queries of the current request.
+
+        The connection is checked out on the first query inside the block and
+        returned to the pool when the block exits, so a request holds at most one
+        connection no matter how many query helpers it calls. Streaming queries
+        still use a dedicated connection, and reads may go to a replica or a
+        read-only connection instead.
+        Nested calls join the outer scope.
+        """
+        if self._request_scope.get() is not None:
+            yield
+            return
+
+        scope = _RequestScope()
+        token = self._request_scope.set(scope)
+        try:
+            yield
+        finally:
+            self._request_scope.reset(token)
+            self._close_request_scope(scope)
+
+
+    @asynccontextmanager
+    async def async_request_scope(self) -> AsyncIterator[None]:
+        """
+        request_scope() for async code such as FastAPI dependencies.
+
+        The request's connection is returned on the database executor, since
+        returning it may roll back an open transaction on the server, which would
+        block the event loop.
+        """
+        if self._request_scope.get() is not None:
+            yield
+            return
+
+        scope = _RequestScope()
+        token = self._request_scope.set(scope)
+        try:
+            yield
+        finally:
+            self._request_scope.reset(token)
+            if scope.connection is None:
+                scope.closed = True
+            else:
+                await self.executor.run_cleanup(self._close_request_scope, scope)
+
+
+    def _close_request_scope(self, scope: _RequestScope) -> None:
+        """Mark a request scope closed and return its connection"""
+        # Copies of the context, e.g. in background threads, must not reuse the connection
+        scope.closed = True
+        connection, scope.connection = scope.connection, None
+        if connection is not None:
+            connection.close()
+
+
+    @contextmanager
+    def _checkout(self, read: bool) -> Iterator[Any]:
+        """
+        Yield the connection for a statement without an explicit connection.
+
+        Inside request_scope() this is the request's connection, unless a read can
+        go to a replica or a read-only connection. Otherwise a connection is
+        checked out and released again.
+        A request connection that lost its server is dropped, so a retry checks
+        out a fresh one.
+        """
+        scope = self._request_scope.get()
+        read_elsewhere = read and (self.read_only_pool is not None or (self.replica_pools and not self._recently_wrote()))
+        if scope is None or scope.closed or read_elsewhere:
+            connection = self.create_read_connection() if read else self.create_connection()
+            try:
+                yield connection
+            finally:
+                connection.close()
+            return
+
+        if scope.connection is None:
+            scope.connection = self.create_connection()
+        try:
+            yield scope.connection
+        except self.backend.Error as err:
+            if err.errno in CONNECTION_ERRNOS:
+                self._drop_request_connection(scope)
+            raise
+
+
+    def _drop_request_connection(self, scope: _RequestScope) -> None:
+        connection, scope.connection = scope.connection, None
+        if isinstance(connection, PooledConnection):
+            connection.invalidate()
+        else:
+            try:
+                connection.close()
+            except self.backend.Error as err:
+                logger.debug(f"Error closing broken request connection: {err}")
+
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Pin one connection for a unit of work and commit once at the end.
+
+        Queries issued inside the block without an explicit connection run on the
+        pinned connection and are not committed individually. The whole block is
+        rolled back if it raises. Nested calls join the outer transaction. Inside
+        request_scope() the request's connection is used.
+
+        Usage:
+            with db_service.transaction() as connection:
+                ...
+        """
+        current = self._transaction_connection.get()
+        if current is not None:
+            yield current
+            return
+
+        scope = self._request_scope.get()
+        owns_connection = scope is None or scope.closed
+        if owns_connection:
+            connection = self.create_connection()
+        else:
+            if scope.connection is None:
+                scope.connection = self.create_connection()
+            connection = scope.connection
+        token = self._transaction_connection.set(connection)
+        writes_token = self._transaction_writes.set(set())
+        self._mark_write()
+        try:
+            yield connection
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            pending_invalidations = self._transaction_writes.get()
+            self._transaction_writes.reset(writes_token)
+            self._transaction_connection.reset(token)
+            if owns_connection:
+                connection.close()
+            for cache, key in pending_invalidations:
+                cache.invalidate(key)
+
+
+    def execute_query(self, sql: str, params: Optional[Tuple] = None, dictionary: bool = True, connection=None, timeout_ms: Optional[int] = None, cache_tables: Optional[Tuple[str, ...]] = None) -> Optional[List[Dict[str, Any]]]:
         """
         Execute a SELECT query with parameterized inputs to prevent SQL injection.
         
+        Queries on their own connection are retried with backoff on transient
+        errors such as deadlocks or lost connections.
+        
         Args:
             sql: SQL query with %s placeholders
             params: Tuple of parameters to bind to the query
             dictionary: Whether to return results as dictionaries
-            connection: Optional existing connection to use
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+            timeout_ms: Maximum execution time, defaults to DB_QUERY_TIMEOUT_MS
+            cache_tables: Tables the query reads. If given and DB_QUERY_CACHE_SIZE
+                is set, the result is served from the query cache until it
+                expires or one of the tables is written
             
         Returns:
             List of dictionaries (if dictionary=True) or tuples, or None on error
+            
+        Raises:
+            DatabaseTimeoutError: If the query exceeded its execution time
+        """
+        return self._select(sql, params, dictionary, connection, timeout_ms, cache_tables=cache_tables)
+
+
+    def _select(self, sql: str, params: Optional[Tuple], dictionary: bool, connection, timeout_ms: Optional[int], describe: bool = False, cache_tables: Optional[Tuple[str, ...]] = None) -> Any:
+        """
+        Shared body of execute_query and fetch_all: returns the rows, or with
+        `describe` a (column names, rows) tuple, and None on error. Queries on
+        an explicit or transaction connection bypass the query cache.
         """
-        standalone_connection = False
         if connection is None:
-            connection = self.create_connection()
-            standalone_connection = True
+            connection = self._transaction_connection.get()
+        if cache_tables and connection is None and self.query_cache is not None:
+            return self._select_cached(sql, params, dictionary, timeout_ms, describe, cache_tables)
+        query = self._with_read_timeout(sql, self.query_timeout_ms if timeout_ms is None else timeout_ms)
         
-        cursor = connection.cursor(dictionary=dictionary)
         try:
-            cursor.execute(sql, params or ())
-            data = cursor.fetchall()
-            return data
-        except mysql.connector.Error as err:
+            if connection is not None:
+                return self._fetch_all(connection, query, params, dictionary, sql, describe)
+            return self._with_retry(lambda: self._fetch_all_standalone(query, params, dictionary, sql, describe), READ_RETRY_ERRNOS)
+        except self.backend.Error as err:
             logger.error("Executing query failed!")
             logger.error(f"SQL:   {sql}")
             logger.error(f"Params: {params}")
             logger.error(f"Error: {err}")
+            self._raise_if_timeout(err)
             return None
+
+
+    def _select_cached(self, sql: str, params: Optional[Tuple], dictionary: bool, timeout_ms: Optional[int], describe: bool, cache_tables: Tuple[str, ...]) -> Any:
+        """Serve a SELECT from the query cache, running and storing it on a miss"""
+        tables = tuple(table.lower() for table in cache_tables)
+        key = (sql, params, dictionary, describe)
+        try:
+            result = self.query_cache.get(key, tables)
+        except TypeError:  # Unhashable parameters
+            return self._select(sql, params, dictionary, None, timeout_ms, describe)
+        if result is None:
+            generation = self.query_cache.generation(tables)
+            result = self._select(sql, params, dictionary, None, timeout_ms, describe)
+            if result is None:
+                return None
+            self.query_cache.set(key, result, tables, generation)
+        # Callers own the rows they get back, so cached dictionaries are copied
+        if describe:
+            return result[0], list(result[1])
+        if dictionary:
+            return [dict(row) for row in result]
+        return list(result)
+
+
+    def _fetch_all_standalone(self, query: str, params: Optional[Tuple], dictionary: bool, sql: str, describe: bool = False) -> Any:
+        """Run a SELECT on the request's connection or its own read connection"""
+        with self._checkout(read=True) as connection:
+            return self._fetch_all(connection, query, params, dictionary, sql, describe)
+
+
+    def _fetch_all(self, connection, query: str, params: Optional[Tuple], dictionary: bool, sql: Optional[str] = None, describe: bool = False) -> Any:
+        """
+        Run a SELECT on the given connection and return all rows, raising on error.
+        `query` is executed, `sql` is the statement without hints for the metrics.
+        With `describe` the column names are returned along with the rows.
+        """
+        sql = sql or query
+        rows, error = 0, None
+        started = time.perf_counter()
+        cursor, statement, cached = self._get_cursor(connection, query, dictionary)
+        try:
+            cursor.execute(statement, params or ())
+            data = cursor.fetchall()
+            rows = len(data)
+            self._record_success(connection)
+            if describe:
+                return column_names(cursor.description), data
+            return data
+        except self.backend.Error as err:
+            error = err
+            self._record_error(connection, err)
+            if cached:
+                self._evict_cursor(connection, query, dictionary)
+            raise
         finally:
-            cursor.close()
-            if standalone_connection: 
-                connection.close()
+            if not cached:
+                cursor.close()
+            self.query_metrics.record(sql, params, time.perf_counter() - started, rows, error)
 
 
-    def execute_single_query(self, sql: str, params: Optional[Tuple] = None, connection=None) -> Optional[Dict[str, Any]]:
+    def execute_single_query(self, sql: str, params: Optional[Tuple] = None, connection=None, timeout_ms: Optional[int] = None, cache_tables: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
         """
         Execute a SELECT query that returns a single row with parameterized inputs.
         
@@ -130,66 +1060,432 @@ class DatabaseService:
             sql: SQL query with %s placeholders
             params: Tuple of parameters to bind to the query
             connection: Optional existing connection to use
+            timeout_ms: Maximum execution time, defaults to DB_QUERY_TIMEOUT_MS
+            cache_tables: Tables the query reads, see execute_query
             
         Returns:
             Dictionary with the first result, or None if no results
         """
-        result = self.execute_query(sql, params, dictionary=True, connection=connection)
+        result = self.execute_query(sql, params, dictionary=True, connection=connection, timeout_ms=timeout_ms, cache_tables=cache_tables)
         if isinstance(result, list) and len(result) > 0:
             return result[0]
         return None
 
 
-    def execute_modification_query(self, sql: str, params: Optional[Tuple] = None, connection=None) -> Optional[int]:
+    def fetch_all(self, sql: str, params: Optional[Tuple] = None, *, model: Type[ModelT], connection=None, timeout_ms: Optional[int] = None, cache_tables: Optional[Tuple[str, ...]] = None) -> Optional[List[ModelT]]:
         """
-        Execute an INSERT, UPDATE, or DELETE query with parameterized inputs.
+        Execute a SELECT query and return its rows as instances of `model`.
+        
+        Rows are read with a tuple cursor, mapped onto the model fields by column
+        name and validated with model_validate. The mapping is computed once per
+        model and column list.
         
         Args:
             sql: SQL query with %s placeholders
             params: Tuple of parameters to bind to the query
+            model: Pydantic model to build from every row
             connection: Optional existing connection to use
+            timeout_ms: Maximum execution time, defaults to DB_QUERY_TIMEOUT_MS
+            cache_tables: Tables the query reads, see execute_query
+            
+        Returns:
+            List of models, or None on error
+            
+        Raises:
+            ValueError: If the result lacks a column for a required model field
+            DatabaseTimeoutError: If the query exceeded its execution time
+        """
+        result = self._select(sql, params, False, connection, timeout_ms, describe=True, cache_tables=cache_tables)
+        if result is None:
+            return None
+        columns, rows = result
+        if not rows:
+            return []
+        return get_row_mapper(model, columns).map_rows(rows)
+
+
+    def fetch_one(self, sql: str, params: Optional[Tuple] = None, *, model: Type[ModelT], connection=None, timeout_ms: Optional[int] = None, cache_tables: Optional[Tuple[str, ...]] = None) -> Optional[ModelT]:
+        """
+        Execute a SELECT query and return its first row as an instance of `model`.
+        
+        See fetch_all for how rows are mapped.
+        
+        Returns:
+            The model built from the first row, or None if no results
+        """
+        result = self._select(sql, params, False, connection, timeout_ms, describe=True, cache_tables=cache_tables)
+        if not result or not result[1]:
+            return None
+        columns, rows = result
+        return get_row_mapper(model, columns)(rows[0])
+
+
+    def batch(self, statements: Sequence[Tuple[str, Optional[Tuple]]], dictionary: bool = True, connection=None, timeout_ms: Optional[int] = None) -> Optional[List[List[Any]]]:
+        """
+        Execute several independent SELECT queries in one round trip.
+        
+        On MySQL the statements are sent as one multi-statement query and the
+        result sets are read one after another. Backends without multi-statement
+        support run them one by one on the same connection. Batches on their own
+        connection are retried like execute_query, the query cache is not used.
+        
+        Usage:
+            users, codes = db_service.batch([
+                ("SELECT * FROM user WHERE id = %s", (user_id,)),
+                ("SELECT * FROM verification_code WHERE user_id = %s", (user_id,)),
+            ])
+        
+        Args:
+            statements: (sql, params) pairs, each a single SELECT without trailing semicolon
+            dictionary: Whether to return rows as dictionaries
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+            timeout_ms: Maximum execution time of each statement, defaults to DB_QUERY_TIMEOUT_MS
+            
+        Returns:
+            One list of rows per statement, in order, or None on error
+            
+        Raises:
+            DatabaseTimeoutError: If a statement exceeded its execution time
+        """
+        if not statements:
+            return []
+        if connection is None:
+            connection = self._transaction_connection.get()
+        timeout_ms = self.query_timeout_ms if timeout_ms is None else timeout_ms
+        queries = [(self._with_read_timeout(sql, timeout_ms), params or ()) for sql, params in statements]
+        batch_sql = "; ".join(sql for sql, _ in statements)
+        
+        try:
+            if connection is not None:
+                return self._fetch_sets(connection, queries, dictionary, batch_sql)
+            return self._with_retry(lambda: self._fetch_sets_standalone(queries, dictionary, batch_sql), READ_RETRY_ERRNOS)
+        except self.backend.Error as err:
+            logger.error("Executing query batch failed!")
+            for sql, params in statements:
+                logger.error(f"SQL:   {sql}")
+                logger.error(f"Params: {params}")
+            logger.error(f"Error: {err}")
+            self._raise_if_timeout(err)
+            return None
+
+
+    def _fetch_sets_standalone(self, queries: List[Tuple[str, Tuple]], dictionary: bool, batch_sql: str) -> List[List[Any]]:
+        """Run a batch on the request's connection or its own read connection"""
+        with self._checkout(read=True) as connection:
+            return self._fetch_sets(connection, queries, dictionary, batch_sql)
+
+
+    def _fetch_sets(self, connection, queries: List[Tuple[str, Tuple]], dictionary: bool, batch_sql: str) -> List[List[Any]]:
+        """
+        Run a batch of SELECTs on the given connection and return one row list per
+        statement. `batch_sql` are the statements without hints for the metrics.
+        """
+        sql = "; ".join(query for query, _ in queries)
+        params = tuple(itertools.chain.from_iterable(query_params for _, query_params in queries))
+        results: List[List[Any]] = []
+        error = None
+        started = time.perf_counter()
+        # Prepared statements cannot hold several statements, so a plain cursor is used
+        cursor = connection.cursor(dictionary=dictionary)
+        try:
+            if self.backend.supports_multi_statements and len(queries) > 1:
+                cursor.execute(sql, params)
+                results.append(cursor.fetchall())
+                while cursor.nextset():
+                    results.append(cursor.fetchall())
+            else:
+                for query, query_params in queries:
+                    cursor.execute(query, query_params)
+                    results.append(cursor.fetchall())
+            self._record_success(connection)
+            return results
+        except self.backend.Error as err:
+            error = err
+            self._record_error(connection, err)
+            raise
+        finally:
+            cursor.close()
+            self.query_metrics.record(batch_sql, params, time.perf_counter() - started, sum(len(rows) for rows in results), error)
+
+
+    def iter_query(self, sql: str, params: Optional[Tuple] = None, batch_size: int = 1000, dictionary: bool = True, timeout_ms: Optional[int] = None) -> RowIterator:
+        """
+        Execute a SELECT query and stream its rows instead of loading them all at once.
+        
+        The query runs on a dedicated connection with an unbuffered cursor, so memory
+        stays flat regardless of the result size. Rows are read from the server in
+        batches of `batch_size`. Unlike execute_query, errors are raised. Transient
+        errors are retried until the first rows arrive, but not while iterating.
+        
+        Streams are limited by DB_STREAM_TIMEOUT_MS instead of DB_QUERY_TIMEOUT_MS,
+        because the server counts the time the client spends consuming the stream.
+        
+        Args:
+            sql: SQL query with %s placeholders
+            params: Tuple of parameters to bind to the query
+            batch_size: Number of rows fetched per round trip
+            dictionary: Whether to return rows as dictionaries
+            timeout_ms: Maximum execution time of the whole stream, defaults to
+                DB_STREAM_TIMEOUT_MS
+            
+        Returns:
+            Iterator over the rows that releases its connection when exhausted or closed
+        """
+        query = self._with_read_timeout(sql, self.stream_timeout_ms if timeout_ms is None else timeout_ms)
+        try:
+            return self._with_retry(lambda: self._start_stream(query, params, batch_size, dictionary, sql), READ_RETRY_ERRNOS)
+        except self.backend.Error as err:
+            logger.error("Executing streaming query failed!")
+            logger.error(f"SQL:   {sql}")
+            logger.error(f"Params: {params}")
+            logger.error(f"Error: {err}")
+            self._raise_if_timeout(err)
+            raise
+
+
+    def _start_stream(self, query: str, params: Optional[Tuple], batch_size: int, dictionary: bool, sql: str) -> RowIterator:
+        """Execute a streaming SELECT on a new read connection"""
+        connection = self.create_read_connection()
+        started = time.perf_counter()
+        try:
+            cursor = connection.cursor(dictionary=dictionary, buffered=False)
+            cursor.execute(query, params or ())
+        except self.backend.Error as err:
+            self._record_error(connection, err)
+            self._release_stream_connection(connection, exhausted=False)
+            self.query_metrics.record(sql, params, time.perf_counter() - started, error=err)
+            raise
+        self._record_success(connection)
+        # Only the time until the server starts sending rows is recorded for streams
+        self.query_metrics.record(sql, params, time.perf_counter() - started)
+        return RowIterator(connection, cursor, batch_size, self._release_stream_connection)
+
+
+    def _release_stream_connection(self, connection, exhausted: bool) -> None:
+        """Return a streaming connection to the pool, or close it if rows were left unread"""
+        if exhausted:
+            connection.close()
+        elif isinstance(connection, PooledConnection):
+            connection.invalidate()
+        else:
+            try:
+                connection.close()
+            except self.backend.Error as err:
+                logger.debug(f"Error closing streaming connection: {err}")
+
+
+    def execute_modification_query(self, sql: str, params: Optional[Tuple] = None, connection=None, timeout_ms: Optional[int] = None) -> Optional[int]:
+        """
+        Execute an INSERT, UPDATE, or DELETE query with parameterized inputs.
+        
+        Statements on their own connection are retried after deadlocks, lock wait
+        timeouts and failed connects, where the statement is known not to have
+        been applied. Statements inside transaction() are never retried, since
+        the whole transaction has been rolled back.
+        
+        Args:
+            sql: SQL query with %s placeholders
+            params: Tuple of parameters to bind to the query
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+            timeout_ms: Maximum time to wait for row locks, rounded up to whole
+                seconds, defaults to DB_LOCK_WAIT_TIMEOUT
             
         Returns:
             Last inserted ID for INSERT queries, or number of affected rows
+            
+        Raises:
+            DatabaseTimeoutError: If the lock wait timeout was still exceeded after retries
         """
-        standalone_connection = False
         if connection is None:
-            connection = self.create_connection()
-            standalone_connection = True
+            connection = self._transaction_connection.get()
+        self._mark_write()
+        lock_wait_timeout = self.lock_wait_timeout if timeout_ms is None else math.ceil(timeout_ms / 1000)
         
-        cursor = connection.cursor()
         try:
-            cursor.execute(sql, params or ())
-            connection.commit()
-            # For INSERT queries, return the last inserted ID
-            # For UPDATE/DELETE queries, return the number of affected rows
-            return cursor.lastrowid if cursor.lastrowid > 0 else cursor.rowcount
-        except mysql.connector.Error as err:
+            if connection is not None:
+                # Statements inside transaction() are committed when the block exits
+                in_transaction = connection is self._transaction_connection.get()
+                return self._modify(connection, sql, params, commit=not in_transaction, lock_wait_timeout=lock_wait_timeout)
+            return self._with_retry(lambda: self._modify_standalone(sql, params, lock_wait_timeout), WRITE_RETRY_ERRNOS)
+        except self.backend.Error as err:
             logger.error("Executing modification query failed!")
             logger.error(f"SQL:   {sql}")
             logger.error(f"Params: {params}")
             logger.error(f"Error: {err}")
+            self._raise_if_timeout(err)
             raise
         finally:
-            cursor.close()
-            if standalone_connection:
-                connection.close()
+            self._invalidate_cache(sql)
 
 
-    def generate_uuid(self, table_name: str, max_tries: int = 1000) -> Optional[str]:
-        """Generate a unique UUID for a table using secure parameterized queries"""
-        connection = self.create_connection()
+    def _modify_standalone(self, sql: str, params: Optional[Tuple], lock_wait_timeout: int) -> int:
+        """Run and commit a modification on the request's connection or its own primary connection"""
+        with self._checkout(read=False) as connection:
+            return self._modify(connection, sql, params, commit=True, lock_wait_timeout=lock_wait_timeout)
+
+
+    def _modify(self, connection, sql: str, params: Optional[Tuple], commit: bool, lock_wait_timeout: int = 0) -> int:
+        """Run a modification on the given connection, raising on error"""
+        self._set_lock_wait_timeout(connection, lock_wait_timeout)
+        rows, error = 0, None
+        started = time.perf_counter()
+        cursor, statement, cached = self._get_cursor(connection, sql, dictionary=False)
+        try:
+            cursor.execute(statement, params or ())
+            if commit:
+                connection.commit()
+            rows = max(cursor.rowcount, 0)
+            self._record_success(connection)
+            # For INSERT queries, return the last inserted ID
+            # For UPDATE/DELETE queries, return the number of affected rows
+            return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
+        except self.backend.Error as err:
+            error = err
+            self._record_error(connection, err)
+            if cached:
+                self._evict_cursor(connection, sql, dictionary=False)
+            raise
+        finally:
+            if not cached:
+                cursor.close()
+            self.query_metrics.record(sql, params, time.perf_counter() - started, rows, error)
+
+
+    def _with_read_timeout(self, sql: str, timeout_ms: int) -> str:
+        """Add the MAX_EXECUTION_TIME hint for a positive timeout on backends that support it"""
+        if timeout_ms <= 0 or not self.backend.supports_statement_timeouts:
+            return sql
+        return with_max_execution_time(sql, timeout_ms)
+
+
+    def _set_lock_wait_timeout(self, connection, seconds: int) -> None:
+        """
+        Set innodb_lock_wait_timeout for the session, or reset it to the server
+        default for 0. Pooled connections remember the value and skip the round
+        trip while it is unchanged.
+        """
+        if not self.backend.supports_statement_timeouts:
+            return
+        pooled = isinstance(connection, PooledConnection)
+        if pooled and connection.session_variables.get("innodb_lock_wait_timeout", 0) == seconds:
+            return
+        if not pooled and seconds <= 0:
+            return
+        cursor = connection.cursor()
         try:
-            uid = str(uuid.uuid4())
-            response = self.execute_query("SELECT id FROM " + table_name + " WHERE id = %s", (uid,), connection=connection)
-            tries = 0
-            while (response and len(response) > 0 and tries < max_tries):
-                uid = str(uuid.uuid4())
-                response = self.execute_query("SELECT id FROM " + table_name + " WHERE id = %s", (uid,), connection=connection)
-                tries += 1
+            if seconds > 0:
+                cursor.execute("SET SESSION innodb_lock_wait_timeout = %s", (seconds,))
+            else:
+                cursor.execute("SET SESSION innodb_lock_wait_timeout = DEFAULT")
+        finally:
+            cursor.close()
+        if pooled:
+            connection.session_variables["innodb_lock_wait_timeout"] = seconds
+
+
+    def _raise_if_timeout(self, err: Exception) -> None:
+        """Surface statement and lock wait timeouts as DatabaseTimeoutError (504)"""
+        if getattr(err, "errno", None) in TIMEOUT_ERRNOS:
+            raise DatabaseTimeoutError() from err
+
+
+    def _with_retry(self, operation: Callable[[], Any], retry_errnos: FrozenSet[int]) -> Any:
+        """Run an operation that opens its own connection, retrying transient errors with jittered backoff"""
+        attempt = 0
+        while True:
+            try:
+                return operation()
+            except self.backend.Error as err:
+                attempt += 1
+                if err.errno not in retry_errnos or attempt >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.delay(attempt - 1)
+                logger.warning(f"Retrying query in {delay * 1000:.0f} ms after transient error (attempt {attempt}): {err}")
+                time.sleep(delay)
+
+
+    def _is_primary(self, connection) -> bool:
+        return not isinstance(connection, PooledConnection) or connection.pool is self.pool or connection.pool is self.read_only_pool
+
+
+    def _record_success(self, connection) -> None:
+        if self._is_primary(connection):
+            self.circuit_breaker.record_success()
+
+
+    def _record_error(self, connection, err: Exception) -> None:
+        """Count lost connections to the primary towards the circuit breaker"""
+        if err.errno in CONNECTION_ERRNOS and self._is_primary(connection):
+            self.circuit_breaker.record_failure()
+
+
+    def execute_many_modification(self, sql: str, seq_of_params: Iterable[Tuple], batch_size: int = 1000, connection=None, timeout_ms: Optional[int] = None) -> List[int]:
+        """
+        Execute an INSERT, UPDATE, or DELETE query for many parameter tuples.
+        
+        Simple `INSERT ... VALUES (...)` statements are rewritten into one multi-row
+        INSERT per batch. Other statements are sent with executemany(). Each batch is
+        committed on its own unless the call runs inside transaction().
+        
+        Args:
+            sql: SQL query with %s placeholders for a single row
+            seq_of_params: Iterable of parameter tuples, one per row
+            batch_size: Maximum number of rows per batch
+            connection: Optional existing connection to use, defaults to the
+                connection of the surrounding transaction() block
+            timeout_ms: Maximum time to wait for row locks, rounded up to whole
+                seconds, defaults to DB_LOCK_WAIT_TIMEOUT
             
-            if tries == max_tries: 
-                return None
-            return uid
+        Returns:
+            Number of affected rows for each batch
+        """
+        if connection is None:
+            connection = self._transaction_connection.get()
+        if connection is None:
+            with self._checkout(read=False) as connection:
+                return self.execute_many_modification(sql, seq_of_params, batch_size, connection=connection, timeout_ms=timeout_ms)
+        in_transaction = connection is self._transaction_connection.get()
+        self._mark_write()
+        self._set_lock_wait_timeout(connection, self.lock_wait_timeout if timeout_ms is None else math.ceil(timeout_ms / 1000))
+
+        affected_rows = []
+        error = None
+        started = time.perf_counter()
+        cursor = connection.cursor()
+        try:
+            for batch in _batches(seq_of_params, batch_size):
+                rewritten = rewrite_multi_row_insert(sql, batch)
+                if rewritten is not None:
+                    cursor.execute(*rewritten)
+                else:
+                    cursor.executemany(sql, batch)
+                if not in_transaction:
+                    connection.commit()
+                affected_rows.append(cursor.rowcount)
+            return affected_rows
+        except self.backend.Error as err:
+            error = err
+            self._record_error(connection, err)
+            logger.error("Executing bulk modification query failed!")
+            logger.error(f"SQL:   {sql}")
+            logger.error(f"Committed batches: {len(affected_rows)}")
+            logger.error(f"Error: {err}")
+            self._raise_if_timeout(err)
+            raise
         finally:
-            connection.close()
+            cursor.close()
+            self.query_metrics.record(sql, None, time.perf_counter() - started, max(sum(affected_rows), 0), error)
+            self._invalidate_cache(sql)
+
+
+    def generate_uuid(self, table_name: Optional[str] = None, max_tries: int = 1000) -> Optional[str]:
+        """
+        Generate a time-ordered UUIDv7 for a new row.
+
+        No query is needed: IDs are unique by construction and the primary key
+        rejects the practically impossible collision, which callers handle by
+        retrying on a duplicate-key error. The arguments are kept for compatibility.
+        """
+        return new_id()
@@ -0,0 +1,128 @@
+"""
+Bounded thread pool for blocking database calls made from async code
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+from .resilience import DatabaseUnavailableError
+
+logger = logging.getLogger('uvicorn.error')
+
+T = TypeVar("T")
+
+
+class DatabaseExecutor:
+    """
+    Runs blocking DatabaseService calls on a dedicated pool of `max_workers` threads.
+
+    Being separate from Starlette's threadpool, a stalled database only ties up
+    these threads, not the ones serving other sync dependencies and endpoints.
+    Calls run in a copy of the caller's context, so they see the request's
+    request_scope() and transaction() connection. When `max_queue` is above 0 and
+    that many calls are already waiting for a thread, further calls are rejected
+    with DatabaseUnavailableError (503) instead of queueing up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int = 0, name: str = "db"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._stats = {"completed": 0, "rejected": 0, "cancelled": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `func(*args, **kwargs)` on the executor and await its result"""
+        with self._lock:
+            if self.max_queue > 0 and self._queued >= self.max_queue:
+                self._stats["rejected"] += 1
+                rejected = True
+            else:
+                self._queued += 1
+                rejected = False
+        if rejected:
+            logger.warning(f"Rejecting database call, {self.max_queue} calls already waiting in executor '{self.name}'")
+            raise DatabaseUnavailableError(retry_after=1)
+
+        context = contextvars.copy_context()
+        call = functools.partial(self._call, time.monotonic(), func, args, kwargs)
+        try:
+            future = self._executor.submit(context.run, call)
+        except RuntimeError:
+            # The executor has been shut down
+            with self._lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+
+    async def run_cleanup(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run `func(*args)` on the executor regardless of max_queue, for releasing
+        resources that must not leak when calls are rejected. After shutdown() it
+        runs on the calling thread.
+        """
+        context = contextvars.copy_context()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, context.run, functools.partial(func, *args))
+        except RuntimeError:
+            # The executor has been shut down
+            return func(*args)
+        return await future
+
+
+    def _call(self, submitted_at: float, func: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        wait_ms = (time.monotonic() - submitted_at) * 1000
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._stats["wait_ms_total"] += wait_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._stats["completed"] += 1
+
+
+    def _on_done(self, future: Future) -> None:
+        # A call cancelled while waiting for a thread never reaches _call
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._stats["cancelled"] += 1
+
+
+    def status(self) -> Dict[str, Any]:
+        """Return queue depth, busy threads, saturation and wait time of the executor"""
+        with self._lock:
+            started = self._stats["completed"] + self._active
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "active": self._active,
+                "saturation": self._active / self.max_workers,
+                "completed": self._stats["completed"],
+                "rejected": self._stats["rejected"],
+                "cancelled": self._stats["cancelled"],
+                "wait_ms_avg": self._stats["wait_ms_total"] / started if started else 0.0,
+                "wait_ms_max": self._stats["wait_ms_max"],
+            }
+
+
+    def shutdown(self) -> None:
+        """Stop accepting calls, calls already submitted still run"""
+        self._executor.shutdown(wait=False)
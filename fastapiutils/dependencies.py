@@ -1,19 +1,22 @@
 """
 Dependency injection container for FastAPI Utils
 """
-from typing import Annotated, Any, Dict, Callable
+from typing import Annotated, Any, AsyncIterator, Dict, Callable, Optional
 
 from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 
 
 from .models import UserInDB
 from .auth_service import AuthService
 from .database_service import DatabaseService
+from .async_database_service import AsyncDatabaseService
 from .mail_service import MailService
 from .i18n_service import I18nService
 from .customer_form_service import CustomerFormService
 from .stripe_service import StripeService
+from .user_queries import WARM_UP_STATEMENTS
 
 
 class DependencyContainer:
@@ -46,6 +49,10 @@ class DependencyContainer:
             
         raise ValueError(f"Service '{service_name}' not found in container")
     
+    def is_created(self, service_name: str) -> bool:
+        """Whether a service instance exists, without creating it from its factory"""
+        return service_name in self._singletons
+
     def clear(self) -> None:
         """Clear all registered services"""
         self._factories.clear()
@@ -61,6 +68,11 @@ def create_database_service() -> DatabaseService:
     return DatabaseService()
 
 
+def create_async_database_service() -> AsyncDatabaseService:
+    """Factory function to create AsyncDatabaseService instance"""
+    return AsyncDatabaseService()
+
+
 def create_customer_form_service() -> CustomerFormService:
     """Factory function to create CustomerFormService instance"""
     return CustomerFormService()
@@ -103,18 +115,29 @@ def setup_dependencies(
     refresh_token_expire_days: int = 30,
     token_url: str = "token",
     private_key_filename: str = "private_key.pem",
-    public_key_filename: str = "public_key.pem"
+    public_key_filename: str = "public_key.pem",
+    warm_connections: Optional[int] = None
 ) -> None:
-    """Setup all dependencies in the container"""
+    """
+    Setup all dependencies in the container.
+
+    `warm_connections` database connections (default DB_POOL_SIZE, 0 to skip)
+    are opened and primed right away, see DatabaseService.startup().
+    """
     container.clear()
     
     # Register singleton instances
-    container.register_singleton("database_service", create_database_service())
+    database_service = create_database_service()
+    database_service.startup(warm_connections, WARM_UP_STATEMENTS)
+    container.register_singleton("database_service", database_service)
     container.register_singleton("mail_service", create_mail_service())
     container.register_singleton("i18n_service", create_i18n_service())
     container.register_singleton("customer_form_service", create_customer_form_service())
     container.register_singleton("stripe_service", create_stripe_service())
 
+    # The async database service is only created when first requested
+    container.register_factory("async_database_service", create_async_database_service)
+
     # Register AuthService singleton instance
     container.register_singleton(
         "auth_service",
@@ -128,6 +151,20 @@ def setup_dependencies(
     )
 
 
+async def shutdown_dependencies(timeout: Optional[float] = None) -> None:
+    """
+    Write buffered last_seen timestamps and drain and close the database pools,
+    call it on application shutdown.
+
+    Connections still in use are waited for up to `timeout` seconds
+    (default DB_POOL_TIMEOUT), see DatabaseService.shutdown().
+    """
+    if container.is_created("async_database_service"):
+        await container.get("async_database_service").close()
+    if container.is_created("database_service"):
+        await run_in_threadpool(container.get("database_service").shutdown, timeout)
+
+
 def get_auth_service() -> AuthService:
     """FastAPI dependency function to get AuthService instance"""
     return container.get("auth_service")
@@ -138,6 +175,26 @@ def get_database_service() -> DatabaseService:
     return container.get("database_service")
 
 
+async def database_request_scope(
+    db_service: DatabaseService = Depends(get_database_service),
+) -> AsyncIterator[None]:
+    """
+    FastAPI dependency that gives all queries of a request one shared connection.
+
+    Add it to a router or app with `dependencies=[Depends(database_request_scope)]`.
+    It is an async dependency so the connection binding is visible to the endpoint
+    and to sync dependencies running in the threadpool. The connection is
+    returned on the database executor, off the event loop.
+    """
+    async with db_service.async_request_scope():
+        yield
+
+
+def get_async_database_service() -> AsyncDatabaseService:
+    """FastAPI dependency function to get AsyncDatabaseService instance"""
+    return container.get("async_database_service")
+
+
 def get_mail_service() -> MailService:
     """FastAPI dependency function to get MailService instance"""
     return container.get("mail_service")
@@ -162,14 +219,14 @@ def get_stripe_service() -> StripeService:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_current_user(
+async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     auth_service = Depends(get_auth_service),
     db_service: DatabaseService = Depends(get_database_service),
     i18n_service: I18nService = Depends(get_i18n_service)
 ) -> UserInDB:
     """Dependency to get current user from JWT token"""
-    return auth_service.get_current_user(token, db_service=db_service, i18n_service=i18n_service)
+    return await db_service.run(auth_service.get_current_user, token, db_service=db_service, i18n_service=i18n_service)
 
 
 def get_current_active_user(
@@ -62,8 +62,9 @@ def _use_verification_code(
         user_id: str,
         db_service: DatabaseService,
 ):
-    VerificationQueries.mark_verification_code_as_used(user_id=user_id, db_service=db_service)
-    VerificationQueries.update_user_email_verified_status(user_id=user_id, verified=True, db_service=db_service)
+    with db_service.transaction():
+        VerificationQueries.mark_verification_code_as_used(user_id=user_id, db_service=db_service)
+        VerificationQueries.update_user_email_verified_status(user_id=user_id, verified=True, db_service=db_service)
     return None
 
 
@@ -253,12 +254,13 @@ def verify_user_email_change(
             i18n_service=i18n_service
         )
     
-    VerificationQueries.update_user_email(user_id=user.id, new_email=verify_request.email, db_service=db_service)
-    
-    _use_verification_code (
-        user_id=user.id,
-        db_service=db_service
-    )
+    with db_service.transaction():
+        VerificationQueries.update_user_email(user_id=user.id, new_email=verify_request.email, db_service=db_service)
+        
+        _use_verification_code (
+            user_id=user.id,
+            db_service=db_service
+        )
     
     return {"detail": i18n_service.t("api.auth.email_change.email_change_verified_successfully", locale)}
 
@@ -298,25 +300,41 @@ def update_forgotten_password_with_code(
     """Update forgotten password using verification code"""
 
     user = UserQueries.get_user_by_email(email=update_forgotten_password.email, db_service=db_service)
-    _check_verification_code(
-        user=user,
-        code=update_forgotten_password.verification_code,
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=i18n_service.t("api.auth.user_management.user_not_found", locale),
+        )
+
+    # Validate and hash before the transaction, so bcrypt does not run while the code row is locked
+    UserValidators.validate_new_password(
+        current_hashed_password=user.hashed_password,
+        pwd_context=auth_service.pwd_context,
         locale=locale,
-        db_service=db_service,
         i18n_service=i18n_service,
+        password_update=None,
+        new_password=update_forgotten_password.new_password
     )
+    new_hashed_password = auth_service.get_password_hash(update_forgotten_password.new_password)
 
-    _use_verification_code (
-        user_id=user.id,
-        db_service=db_service
-    )
+    with db_service.transaction():
+        _check_verification_code(
+            user=user,
+            code=update_forgotten_password.verification_code,
+            locale=locale,
+            db_service=db_service,
+            i18n_service=i18n_service,
+        )
 
-    auth_service.update_password(
-        user_id=user.id,
-        new_password=update_forgotten_password.new_password,
-        db_service=db_service,
-        i18n_service=i18n_service,
-        locale=locale
-    )
+        _use_verification_code (
+            user_id=user.id,
+            db_service=db_service
+        )
+
+        UserQueries.update_user_password(
+            user_id=user.id,
+            hashed_password=new_hashed_password,
+            db_service=db_service
+        )
     
     return {"detail": i18n_service.t("api.auth.password_management.forgotten_password_updated_successfully", locale)}
\ No newline at end of file
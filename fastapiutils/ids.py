@@ -0,0 +1,53 @@
+"""
+Time-ordered identifiers for primary keys
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_timestamp_ms = 0
+_counter = 0
+
+_COUNTER_BITS = 12
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a UUIDv7 as specified in RFC 9562.
+
+    The first 48 bits hold the Unix timestamp in milliseconds, so new IDs are
+    appended to the end of a clustered primary key index instead of being
+    scattered across it like UUID4. IDs generated in the same millisecond stay
+    monotonic through a 12 bit counter that starts at a random value, followed
+    by 62 random bits.
+    """
+    global _last_timestamp_ms, _counter
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_timestamp_ms:
+            _counter = int.from_bytes(os.urandom(2), "big") & (_COUNTER_MAX >> 1)
+        else:
+            # Same millisecond or clock moved backwards: keep counting on the last timestamp
+            timestamp_ms = _last_timestamp_ms
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                timestamp_ms += 1
+                _counter = 0
+        _last_timestamp_ms = timestamp_ms
+        counter = _counter
+
+    random_bits = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76  # version
+    value |= counter << 64
+    value |= 0b10 << 62  # RFC 4122 variant
+    value |= random_bits
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Return a new UUIDv7 in the canonical 36 character form used by the id columns"""
+    return str(uuid7())
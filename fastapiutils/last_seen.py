@@ -0,0 +1,135 @@
+"""
+Write-behind buffer for user last_seen timestamps
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import logging
+import threading
+
+logger = logging.getLogger('uvicorn.error')
+
+# Users written per UPDATE statement, bounds the statement size
+FLUSH_CHUNK_SIZE = 512
+
+
+def _padded_size(count: int) -> int:
+    """Round up to a power of two, so flushes reuse a few statement texts"""
+    size = 1
+    while size < count:
+        size *= 2
+    return size
+
+
+def build_last_seen_update(last_seen: List[Tuple[str, datetime]]) -> Tuple[str, Tuple]:
+    """
+    Build one `UPDATE user SET last_seen = CASE id ... END` statement for many users.
+
+    The list is padded to a power of two by repeating its last entry, so there is
+    one statement text per size class rather than per batch size, for the query
+    metrics and the prepared statement cache.
+    """
+    last_seen = last_seen + last_seen[-1:] * (_padded_size(len(last_seen)) - len(last_seen))
+    cases = " ".join(["WHEN %s THEN %s"] * len(last_seen))
+    placeholders = ", ".join(["%s"] * len(last_seen))
+    sql = f"UPDATE user SET last_seen = CASE id {cases} END WHERE id IN ({placeholders})"
+    params = tuple(value for pair in last_seen for value in pair) + tuple(user_id for user_id, _ in last_seen)
+    return sql, params
+
+
+class LastSeenBuffer:
+    """
+    Collects last_seen timestamps in memory and writes them in batches.
+
+    Only the latest timestamp per user is kept. A background thread, started on
+    the first record(), flushes every `flush_interval` seconds, or as soon as
+    `max_size` users are pending. Timestamps of a failed flush are kept for the
+    next one. close() stops the thread and flushes what is left.
+    """
+
+    def __init__(self, db_service: Any, flush_interval: float, max_size: int):
+        self.db_service = db_service
+        self.flush_interval = flush_interval
+        self.max_size = max(1, max_size)
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {"recorded": 0, "flushes": 0, "written": 0, "errors": 0}
+
+
+    def record(self, user_id: str, seen_at: datetime) -> None:
+        """Remember that a user was seen, to be written with the next flush"""
+        with self._lock:
+            self._pending[user_id] = seen_at
+            self._stats["recorded"] += 1
+            full = len(self._pending) >= self.max_size
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="last-seen-flush", daemon=True)
+                self._thread.start()
+            closed = self._closed
+        if closed:
+            self.flush()
+        elif full:
+            self._wake.set()
+
+
+    def flush(self) -> int:
+        """Write all pending timestamps, returning the number of users written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            items = list(pending.items())
+            written = 0
+            try:
+                for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                    sql, params = build_last_seen_update(items[start:start + FLUSH_CHUNK_SIZE])
+                    self.db_service.execute_modification_query(sql, params)
+                    written = start + FLUSH_CHUNK_SIZE
+            except Exception as e:
+                logger.warning(f"Writing last_seen of {len(items) - written} user(s) failed, retrying with the next flush: {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                    for user_id, seen_at in items[written:]:
+                        # Keep timestamps recorded since the flush started
+                        self._pending.setdefault(user_id, seen_at)
+            written = min(written, len(items))
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["written"] += written
+            return written
+
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the flush thread and write the remaining timestamps"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pending users and record, flush, write and error counters"""
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending)}
+
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                closed = self._closed
+            if closed:
+                return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Unexpected error flushing last_seen timestamps")
@@ -0,0 +1,6 @@
+-- Case-insensitive user lookups compare `username` and `email` with plain `=`,
+-- relying on the column collation instead of LOWER(), so that the unique keys
+-- can be used. Pin the collation for tables created with a different default.
+ALTER TABLE `user`
+  MODIFY `username` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL,
+  MODIFY `email` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL;
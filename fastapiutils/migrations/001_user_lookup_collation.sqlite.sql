@@ -0,0 +1,2 @@
+-- `username` and `email` are created with COLLATE NOCASE by requirements.sqlite.sql,
+-- so their unique indexes already serve case-insensitive lookups.
@@ -0,0 +1,3 @@
+-- Covering index for id -> username lookups (get_username_by_id, get_user_ids_to_names),
+-- served from the small secondary index instead of the clustered rows.
+CREATE INDEX `idx_user_id_username` ON `user` (`id`, `username`);
@@ -0,0 +1 @@
+-- SQLite answers id lookups from the primary key index, the covering index is MySQL only.
@@ -0,0 +1,217 @@
+"""
+In-process caches for query results
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+import re
+import threading
+import time
+
+_WRITE_TABLE_PATTERN = re.compile(
+    r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|DELETE\s+FROM)\s+"
+    r"(?:`?\w+`?\.)?`?(\w+)`?",
+    re.IGNORECASE,
+)
+_MULTI_TABLE_PATTERN = re.compile(r"\bJOIN\b|\bUSING\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def written_table(sql: str) -> Optional[str]:
+    """
+    Return the table an INSERT, REPLACE, UPDATE or DELETE statement writes to,
+    or None if it cannot be told, e.g. for multi-table statements
+    """
+    match = _WRITE_TABLE_PATTERN.match(sql)
+    if match is None or _MULTI_TABLE_PATTERN.search(sql):
+        return None
+    return match.group(1).lower()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after they were set.
+
+    Once `max_size` entries are stored, setting another one evicts the least
+    recently used entry.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored for `key`, or `default` if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove an entry, returning its value or None"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry is not None else None
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss, eviction and expiration counters and the current size"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_size": self.max_size, "ttl": self.ttl}
+
+
+class QueryCache:
+    """
+    Read-through cache of SELECT results, tagged with the tables they read.
+
+    Every table has a generation that is bumped when a statement writes to it.
+    Entries remember the generations of their tables when the query started, and
+    an entry whose tables were written since is dropped on the next lookup. A
+    result whose tables changed while the query was running is not stored at all.
+    Writes to an unknown table bump a global generation shared by all entries.
+
+    Only writes made through this process are seen, writes of other workers
+    become visible when the entry expires.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = TTLCache(max_size, ttl)
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+    def generation(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Snapshot of the generations of `tables`, taken before running the query"""
+        generations = self._generations
+        return (self._global_generation,) + tuple(generations.get(table, 0) for table in tables)
+
+
+    def get(self, key: Hashable, tables: Tuple[str, ...]) -> Any:
+        """Return the cached result for `key`, or None if there is no current one"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] != self.generation(tables):
+            self._entries.pop(key)
+            entry = None
+            with self._lock:
+                self._stats["invalidations"] += 1
+        with self._lock:
+            self._stats["hits" if entry is not None else "misses"] += 1
+        return entry[1] if entry is not None else None
+
+
+    def set(self, key: Hashable, value: Any, tables: Tuple[str, ...], generation: Tuple[int, ...]) -> None:
+        """Store a result unless one of its tables was written since `generation` was taken"""
+        if generation == self.generation(tables):
+            self._entries.set(key, (generation, value))
+
+
+    def invalidate(self, table: Optional[str]) -> None:
+        """Outdate all entries reading `table`, or all entries for None"""
+        with self._lock:
+            if table is None:
+                self._global_generation += 1
+            else:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss, eviction, expiration and invalidation counters"""
+        entry_stats = self._entries.stats()
+        with self._lock:
+            return {
+                **self._stats,
+                "evictions": entry_stats["evictions"],
+                "expirations": entry_stats["expirations"],
+                "size": entry_stats["size"],
+                "max_size": entry_stats["max_size"],
+                "ttl": entry_stats["ttl"],
+            }
+
+
+class ObjectCache:
+    """
+    Read-through cache of single objects by key, such as users by id, that
+    callers invalidate explicitly when they write the object.
+
+    A value loaded while any key was invalidated is not stored, since it may have
+    been read before that write. Invalidations are rare compared to reads, so
+    skipping a few stores is cheaper than tracking a generation per key.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = TTLCache(max_size, ttl)
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._invalidations = 0
+
+
+    def epoch(self) -> int:
+        """Snapshot to pass to set(), taken before loading the value"""
+        return self._epoch
+
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for `key`, or None"""
+        return self._entries.get(key)
+
+
+    def set(self, key: Hashable, value: Any, epoch: int) -> None:
+        """Store a value unless something was invalidated since `epoch` was taken"""
+        with self._lock:
+            if epoch == self._epoch:
+                self._entries.set(key, value)
+
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._invalidations += 1
+            self._entries.pop(key)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss, eviction, expiration and invalidation counters"""
+        with self._lock:
+            return {**self._entries.stats(), "invalidations": self._invalidations}
@@ -0,0 +1,167 @@
+"""
+Per-statement query instrumentation for the database services
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import logging
+import re
+import threading
+
+logger = logging.getLogger('uvicorn.error')
+
+# Upper bounds of the latency histogram buckets in milliseconds
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_IN_LIST_PATTERN = re.compile(r"\bIN\s*\(\s*%s(?:\s*,\s*%s)*\s*\)", re.IGNORECASE)
+_VALUES_ROWS_PATTERN = re.compile(r"(\([^()]*\))(?:\s*,\s*\([^()]*\))+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace, IN lists and multi-row VALUES so equal statements share one key"""
+    normalized = _WHITESPACE_PATTERN.sub(" ", sql).strip()
+    normalized = _IN_LIST_PATTERN.sub("IN (...)", normalized)
+    return _VALUES_ROWS_PATTERN.sub(r"\1, ...", normalized)
+
+
+def describe_params(params: Optional[Sequence[Any]]) -> str:
+    """Describe parameters by type only, so no values such as password hashes end up in logs"""
+    if not params:
+        return "()"
+    return "(" + ", ".join(type(param).__name__ for param in params) + ")"
+
+
+class QueryEvent(NamedTuple):
+    """A single executed statement as passed to query hooks"""
+    sql: str
+    statement: str
+    params: Optional[Sequence[Any]]
+    duration_ms: float
+    rows: int
+    error: Optional[BaseException]
+
+
+class StatementStats:
+    """Aggregated latency, row and error counters of one normalized statement"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float, rows: int, failed: bool) -> None:
+        self.count += 1
+        self.errors += 1 if failed else 0
+        self.rows += rows
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.histogram[index] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a latency percentile as the upper bound of the bucket that contains it"""
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.histogram):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "histogram": {
+                **{f"le_{bound:g}ms": self.histogram[index] for index, bound in enumerate(LATENCY_BUCKETS_MS)},
+                "le_inf": self.histogram[-1],
+            },
+        }
+
+
+class QueryMetrics:
+    """
+    Records latency histograms, row counts and error counts per normalized statement.
+
+    Statements slower than `slow_query_ms` are logged with their parameter types.
+    If an `explain` callback is given, slow SELECTs are also logged with their
+    EXPLAIN output. Additional hooks receive a QueryEvent for every statement.
+    """
+
+    def __init__(self, slow_query_ms: float = 0, explain: Optional[Callable[[str, Optional[Sequence[Any]]], Any]] = None):
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self._hooks: List[Callable[[QueryEvent], None]] = []
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+
+    def add_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        """Register a callable that is invoked with a QueryEvent after every statement"""
+        self._hooks.append(hook)
+
+
+    def remove_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        """Unregister a previously added hook"""
+        self._hooks.remove(hook)
+
+
+    def record(self, sql: str, params: Optional[Sequence[Any]], duration_s: float, rows: int = 0, error: Optional[BaseException] = None) -> None:
+        """Record one executed statement"""
+        statement = normalize_sql(sql)
+        duration_ms = duration_s * 1000
+        with self._lock:
+            stats = self._stats.get(statement)
+            if stats is None:
+                stats = self._stats[statement] = StatementStats()
+            stats.add(duration_ms, rows, error is not None)
+
+        if self.slow_query_ms and duration_ms >= self.slow_query_ms:
+            self._log_slow_query(sql, statement, params, duration_ms, rows)
+
+        if self._hooks:
+            event = QueryEvent(sql, statement, params, duration_ms, rows, error)
+            for hook in list(self._hooks):
+                try:
+                    hook(event)
+                except Exception as err:
+                    logger.warning(f"Query hook {hook!r} failed: {err}")
+
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the collected statistics keyed by normalized statement"""
+        with self._lock:
+            return {statement: stats.to_dict() for statement, stats in self._stats.items()}
+
+
+    def reset(self) -> None:
+        """Discard all collected statistics"""
+        with self._lock:
+            self._stats.clear()
+
+
+    def _log_slow_query(self, sql: str, statement: str, params: Optional[Sequence[Any]], duration_ms: float, rows: int) -> None:
+        logger.warning(f"Slow query ({duration_ms:.1f} ms, {rows} rows): {statement} params={describe_params(params)}")
+        if self.explain is None or not statement.upper().startswith("SELECT"):
+            return
+        try:
+            plan = self.explain(sql, params)
+            logger.warning(f"EXPLAIN for slow query: {plan}")
+        except Exception as err:
+            logger.warning(f"Could not EXPLAIN slow query: {err}")
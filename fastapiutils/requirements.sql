@@ -1,7 +1,7 @@
 CREATE TABLE IF NOT EXISTS `user` (
   `id` varchar(36) NOT NULL,
-  `username` varchar(50) NOT NULL,
-  `email` varchar(100) NOT NULL,
+  `username` varchar(50) COLLATE utf8mb4_0900_ai_ci NOT NULL,
+  `email` varchar(100) COLLATE utf8mb4_0900_ai_ci NOT NULL,
   `email_verified` tinyint(1) NOT NULL DEFAULT '0',
   `premium_level` int DEFAULT '0',
   `is_admin` tinyint(1) NOT NULL DEFAULT '0',
@@ -0,0 +1,52 @@
+CREATE TABLE IF NOT EXISTS `user` (
+  `id` varchar(36) NOT NULL,
+  `username` varchar(50) NOT NULL COLLATE NOCASE,
+  `email` varchar(100) NOT NULL COLLATE NOCASE,
+  `email_verified` tinyint(1) NOT NULL DEFAULT 0,
+  `premium_level` int DEFAULT 0,
+  `is_admin` tinyint(1) NOT NULL DEFAULT 0,
+  `stripe_customer_id` varchar(50) DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `last_seen` timestamp NULL DEFAULT NULL,
+  `disabled` tinyint(1) NOT NULL DEFAULT 0,
+  `hashed_password` varchar(255) NOT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE (`username`),
+  UNIQUE (`email`)
+);
+
+
+CREATE TABLE IF NOT EXISTS `verification_code` (
+  `user_id` varchar(36) NOT NULL,
+  `value` varchar(6) NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `verified_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`user_id`),
+  FOREIGN KEY (`user_id`) REFERENCES `user` (`id`) ON DELETE CASCADE
+);
+
+
+CREATE TABLE IF NOT EXISTS `cancellation` (
+  `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `email` varchar(255) NOT NULL,
+  `name` varchar(100) NOT NULL,
+  `last_name` varchar(100) NOT NULL,
+  `address` varchar(255) NOT NULL,
+  `town` varchar(100) NOT NULL,
+  `town_number` varchar(10) NOT NULL,
+  `is_unordinary` tinyint DEFAULT 0,
+  `reason` varchar(255) DEFAULT NULL,
+  `last_invoice_number` varchar(50) NOT NULL,
+  `termination_date` date NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `is_archived` tinyint DEFAULT 0
+);
+
+
+CREATE TABLE IF NOT EXISTS `feedback` (
+  `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+  `email` varchar(255) DEFAULT NULL,
+  `text` varchar(500) DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `is_archived` tinyint DEFAULT 0
+);
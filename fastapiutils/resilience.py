@@ -0,0 +1,160 @@
+"""
+Retry and circuit breaker policies for transient database failures
+"""
+from fastapi import HTTPException, status
+from typing import Any, Dict, FrozenSet
+
+import logging
+import math
+import random
+import threading
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+# MySQL client errors meaning the server could not be reached or the connection dropped
+CONNECTION_ERRNOS: FrozenSet[int] = frozenset({
+    1040,  # ER_CON_COUNT_ERROR: too many connections
+    2003,  # CR_CONN_HOST_ERROR: can't connect to server
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST: lost connection during query
+    2055,  # CR_SERVER_LOST_EXTENDED
+})
+
+# Errors after which the statement is known to have been rolled back
+ROLLED_BACK_ERRNOS: FrozenSet[int] = frozenset({
+    1205,  # ER_LOCK_WAIT_TIMEOUT
+    1213,  # ER_LOCK_DEADLOCK
+})
+
+# Reads are idempotent, so every transient error can be retried
+READ_RETRY_ERRNOS: FrozenSet[int] = CONNECTION_ERRNOS | ROLLED_BACK_ERRNOS
+
+# A write that lost its connection mid-statement may already be committed,
+# so writes are only retried when the statement certainly did not apply
+WRITE_RETRY_ERRNOS: FrozenSet[int] = ROLLED_BACK_ERRNOS | frozenset({1040, 2003})
+
+
+class DatabaseUnavailableError(HTTPException):
+    """
+    Raised while the circuit breaker is open, the database executor is full or no
+    pooled connection became free in time, answered with 503 and a Retry-After header
+    """
+
+    def __init__(self, retry_after: float):
+        seconds = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable",
+            headers={"Retry-After": str(seconds)},
+        )
+
+
+# Errors meaning a statement ran into its execution time or lock wait limit
+TIMEOUT_ERRNOS: FrozenSet[int] = frozenset({
+    1205,  # ER_LOCK_WAIT_TIMEOUT
+    3024,  # ER_QUERY_TIMEOUT: MAX_EXECUTION_TIME exceeded
+})
+
+
+class DatabaseTimeoutError(HTTPException):
+    """Raised when a statement exceeded its time limit, answered with 504"""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Database query timed out",
+        )
+
+
+class RetryPolicy:
+    """Bounded retries with exponential backoff and full jitter"""
+
+    def __init__(self, max_attempts: int = 3, backoff_base: float = 0.05, backoff_max: float = 1.0):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to sleep before retry number `attempt` (starting at 0)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the database is unhealthy.
+
+    After `failure_threshold` consecutive connection failures the breaker opens and
+    every call raises DatabaseUnavailableError for `reset_timeout` seconds. Then a
+    single trial call is let through: success closes the breaker again, failure
+    reopens it. A threshold of 0 disables the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "database"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+
+    def before_call(self) -> None:
+        """Raise DatabaseUnavailableError if calls are currently rejected"""
+        if self.failure_threshold <= 0 or self._state == self.CLOSED:
+            return
+        with self._lock:
+            now = time.monotonic()
+            remaining = self._opened_at + self.reset_timeout - now
+            if self._state == self.OPEN and remaining <= 0:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                # Let one trial call through, or another one if the last never reported back
+                if not self._trial_in_flight or now - self._trial_started_at > self.reset_timeout:
+                    self._trial_in_flight = True
+                    self._trial_started_at = now
+                    return
+        raise DatabaseUnavailableError(retry_after=remaining)
+
+
+    def record_success(self) -> None:
+        """Reset the failure count and close the breaker"""
+        if self._state == self.CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit breaker '{self.name}' closed, database reachable again")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+
+    def record_failure(self) -> None:
+        """Count a connection failure and open the breaker once the threshold is reached"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.error(
+                        f"Circuit breaker '{self.name}' opened after {self._failures} failures, "
+                        f"rejecting queries for {self.reset_timeout}s"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+    def status(self) -> Dict[str, Any]:
+        """Return the breaker state and consecutive failure count"""
+        with self._lock:
+            return {"state": self._state, "failures": self._failures}
@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi.responses import StreamingResponse
 
 from ..models import Cancellation, CreateCancellation, CreateFeedback, Feedback
 from ..database_service import DatabaseService
 from ..i18n_service import I18nService
 from ..customer_form_service import CustomerFormService
-from ..dependencies import CurrentAdminUser, get_customer_form_service, get_database_service, get_i18n_service
+from ..streaming import stream_json_array
+from ..dependencies import CurrentAdminUser, get_customer_form_service, get_database_service, get_i18n_service, database_request_scope
 
 import logging
 
 logger = logging.getLogger('uvicorn.error')
 
 """Create customer form management router"""
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(database_request_scope)])
 
 @router.get("/forms/cancellation", response_model=list[Cancellation], tags=["forms"])
 def get_cancellation(
@@ -25,11 +27,12 @@ def get_cancellation(
     locale = i18n_service.extract_locale_from_request(request)
     if not current_admin.is_admin:
         raise HTTPException(status_code=403)
-    return customer_service.get_cancellations(
+    cancellations = customer_service.iter_cancellations(
         db_service=db_service,
         i18n_service=i18n_service,
         locale=locale
         )
+    return StreamingResponse(stream_json_array(cancellations), media_type="application/json")
 
 
 @router.post("/forms/cancellation", tags=["forms"], status_code=201)
@@ -79,11 +82,12 @@ def get_feedback(
     ):
     """Get all feedback"""
     locale = i18n_service.extract_locale_from_request(request)
-    return customer_service.get_feedbacks(
+    feedbacks = customer_service.iter_feedbacks(
         db_service=db_service,
         i18n_service=i18n_service,
         locale=locale
         )
+    return StreamingResponse(stream_json_array(feedbacks), media_type="application/json")
 
 
 @router.post("/forms/feedback", tags=["forms"], status_code=201)
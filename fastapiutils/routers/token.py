@@ -9,10 +9,10 @@ from ..auth_service import AuthService
 from ..database_service import DatabaseService
 from ..i18n_service import I18nService
 from ..models import LoginCredentials, Token, RefreshTokenRequest, TokenData
-from ..dependencies import get_auth_service, get_database_service, get_i18n_service
+from ..dependencies import get_auth_service, get_database_service, get_i18n_service, database_request_scope
 
 """Create authentication router with dependency injection"""
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(database_request_scope)])
 
 @router.post("/token", response_model=Token, tags=["tokens"])
 async def login_for_access_token(
@@ -24,7 +24,8 @@ async def login_for_access_token(
     stay_logged_in: bool = Query(False, description="Whether to issue a refresh token")
 ) -> Token:
     locale = i18n_service.extract_locale_from_request(request)
-    return auth_service.get_token_for_user(
+    return await db_service.run(
+        auth_service.get_token_for_user,
         username_or_email=form_data.username,
         password=form_data.password,
         db_service=db_service,
@@ -60,11 +61,12 @@ async def refresh_access_token(
         raise credentials_exception
     
     # Get and validate current user
-    user = UserQueries.get_user_by_id(token_data.user_id, db_service=db_service)
+    user = await db_service.run(UserQueries.get_user_by_id, token_data.user_id, db_service=db_service)
     if user is None or user.disabled:
         raise credentials_exception
     
-    access_token = auth_service.create_bearer_token(
+    access_token = await db_service.run(
+        auth_service.create_bearer_token,
         user=user,
         db_service=db_service
         )
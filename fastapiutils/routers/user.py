@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 
 from ..user_queries import UserQueries
 from ..auth_service import AuthService
@@ -7,14 +8,15 @@ from ..database_service import DatabaseService
 from ..email_verification import resend_verification_code, send_email_change_verification, send_forgot_password_verification, update_forgotten_password_with_code, verify_forgot_password_with_code, verify_user_email_change, verify_user_email_with_code
 from ..mail_service import MailService
 from ..models import CreateUser, SendVerificationRequest, UpdateForgottenPassword, User, UserInDBNoPassword, VerifyEmailRequest, UpdateUser, UpdatePassword, VerifyEmailRequest
-from ..dependencies import CurrentAdminUser, get_auth_service, get_database_service, get_mail_service, get_i18n_service, CurrentActiveUser
+from ..streaming import stream_json_array
+from ..dependencies import CurrentAdminUser, get_auth_service, get_database_service, get_mail_service, get_i18n_service, CurrentActiveUser, database_request_scope
 
 import logging
 
 logger = logging.getLogger('uvicorn.error')
 
 """Create user management router with dependency injection"""
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(database_request_scope)])
 
 
 @router.get("/user/me", response_model=User, tags=["user-information"])
@@ -32,7 +34,8 @@ async def create_new_user(
     i18n_service: I18nService = Depends(get_i18n_service),
 ):
     locale = i18n_service.extract_locale_from_request(request)
-    return auth_service.register_new_user(
+    return await db_service.run(
+        auth_service.register_new_user,
         user=user,
         locale=locale,
         db_service=db_service,
@@ -49,7 +52,8 @@ async def verify_user_email(
     i18n_service: I18nService = Depends(get_i18n_service),
 ):
     locale = i18n_service.extract_locale_from_request(request)
-    return verify_user_email_with_code(
+    return await db_service.run(
+        verify_user_email_with_code,
         verify_request=verify_request,
         locale=locale,
         db_service=db_service, 
@@ -66,7 +70,8 @@ async def send_new_verification_code(
     mail_service: MailService = Depends(get_mail_service),
 ):
     locale = i18n_service.extract_locale_from_request(request)
-    return resend_verification_code(
+    return await db_service.run(
+        resend_verification_code,
         email=send_verification_request.email,
         locale=locale,
         db_service=db_service,
@@ -86,7 +91,8 @@ async def update_user_info(
 ):
     """Update current user's information"""
     locale = i18n_service.extract_locale_from_request(request)
-    return auth_service.update_user(
+    return await db_service.run(
+        auth_service.update_user,
         user_id=current_user.id, 
         user_update=user_update,
         locale=locale,
@@ -106,7 +112,8 @@ async def change_user_password(
 ):
     """Update current user's password"""
     locale = i18n_service.extract_locale_from_request(request)
-    return auth_service.update_password(
+    return await db_service.run(
+        auth_service.update_password,
         user_id=current_user.id,
         password_update=password_update,
         locale=locale,
@@ -127,7 +134,8 @@ async def request_user_email_change(
     """Initiate email change process - sends verification code to new email"""
     locale = i18n_service.extract_locale_from_request(request)
 
-    return send_email_change_verification(
+    return await db_service.run(
+        send_email_change_verification,
         user=current_user,
         new_email=send_verification_request.email,
         locale=locale,
@@ -147,7 +155,8 @@ async def user_email_change_verification(
 ):
     """Verify email change with 6-digit code and update user's email"""
     locale = i18n_service.extract_locale_from_request(request)
-    return verify_user_email_change(
+    return await db_service.run(
+        verify_user_email_change,
         user=current_user,
         verify_request=verify_request,
         locale=locale,
@@ -165,7 +174,8 @@ async def request_forgot_password(
     mail_service: MailService = Depends(get_mail_service),
 ):
     locale = i18n_service.extract_locale_from_request(request)
-    return send_forgot_password_verification(
+    return await db_service.run(
+        send_forgot_password_verification,
         email=send_verification_request.email,
         locale=locale,
         db_service=db_service,
@@ -183,7 +193,8 @@ async def forgot_password_verification(
 ):
     """Verify email change with 6-digit code and update user's email"""
     locale = i18n_service.extract_locale_from_request(request)
-    return verify_forgot_password_with_code(
+    return await db_service.run(
+        verify_forgot_password_with_code,
         verify_request=verify_request,
         locale=locale,
         db_service=db_service,
@@ -201,7 +212,8 @@ async def change_forgotten_password(
 ):
     """Verify email change with 6-digit code and update user's email"""
     locale = i18n_service.extract_locale_from_request(request)
-    return update_forgotten_password_with_code(
+    return await db_service.run(
+        update_forgotten_password_with_code,
         update_forgotten_password=update_forgotten_password,
         locale=locale,
         auth_service=auth_service,
@@ -219,7 +231,8 @@ async def get_username_by_id(
 ):
     """Get username by user ID"""
     locale = i18n_service.extract_locale_from_request(request)
-    return UserQueries.get_username_by_id(
+    return await db_service.run(
+        UserQueries.get_username_by_id,
         user_id=user_id,
         db_service=db_service,
         i18n_service=i18n_service,
@@ -236,7 +249,8 @@ async def get_user_ids_to_names(
 ):
     """Get user names by their IDs"""
     locale = i18n_service.extract_locale_from_request(request)
-    return UserQueries.get_user_ids_to_names(
+    return await db_service.run(
+        UserQueries.get_user_ids_to_names,
         user_ids=user_ids,
         db_service=db_service,
         i18n_service=i18n_service,
@@ -255,11 +269,14 @@ async def get_all_users(
     locale = i18n_service.extract_locale_from_request(request)
     if not current_admin.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    return UserQueries.get_all_users(
+    users = await db_service.run(
+        UserQueries.iter_all_users,
         db_service=db_service,
         i18n_service=i18n_service,
         locale=locale
     )
+    # Drive the fetchmany round trips on the database executor, not Starlette's threadpool
+    return StreamingResponse(db_service.iterate(stream_json_array(users)), media_type="application/json")
 
 
 @router.delete("/user/{user_id}", status_code=200, tags=["user-management"])
@@ -275,7 +292,8 @@ async def delete_user(
     if not current_admin.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
     
-    return UserQueries.delete_user(
+    return await db_service.run(
+        UserQueries.delete_user,
         user_id=user_id,
         db_service=db_service,
         i18n_service=i18n_service,
@@ -0,0 +1,51 @@
+"""
+Mapping of tuple rows straight into Pydantic models
+"""
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class RowMapper:
+    """
+    Builds instances of `model` from rows of a tuple cursor with the given columns.
+
+    Which column feeds which field is worked out once per model and column list.
+    Every row is then validated with model_validate, so integer booleans and
+    bytearray text are converted as usual. Columns without a matching field are
+    ignored, fields without a column get their default.
+    """
+
+    def __init__(self, model: Type[ModelT], columns: Sequence[str]):
+        fields = model.model_fields
+        missing = [name for name, field in fields.items() if field.is_required() and name not in columns]
+        if missing:
+            raise ValueError(f"Columns for required fields of {model.__name__} are missing: {', '.join(missing)}")
+
+        self.model = model
+        self._positions: List[Tuple[int, str]] = [
+            (position, column) for position, column in enumerate(columns) if column in fields
+        ]
+
+
+    def __call__(self, row: Sequence[Any]) -> ModelT:
+        return self.model.model_validate({name: row[position] for position, name in self._positions})
+
+
+    def map_rows(self, rows: Sequence[Sequence[Any]]) -> List[ModelT]:
+        """Build one model per row"""
+        return [self(row) for row in rows]
+
+
+@lru_cache(maxsize=256)
+def get_row_mapper(model: Type[ModelT], columns: Tuple[str, ...]) -> RowMapper:
+    """Return the cached RowMapper for a model and the column names of a result set"""
+    return RowMapper(model, columns)
+
+
+def column_names(description: Optional[Sequence[Sequence[Any]]]) -> Tuple[str, ...]:
+    """Return the column names from a DB-API cursor description"""
+    return tuple(column[0] for column in description or ())
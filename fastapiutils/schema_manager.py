@@ -0,0 +1,171 @@
+"""
+Versioned schema bootstrap for DatabaseService
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import hashlib
+import logging
+import os
+
+from mysql.connector import errorcode
+
+from .database_backends import MySQLBackend
+
+logger = logging.getLogger('uvicorn.error')
+
+REQUIREMENTS_SCRIPTS = ("requirements.sql", "requirements.sqlite.sql")
+SCHEMA_LOCK_NAME = "fastapiutils_schema"
+
+CREATE_SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS `schema_version` (
+  `name` varchar(255) NOT NULL,
+  `checksum` char(64) NOT NULL,
+  `applied_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+"""
+
+CREATE_SCHEMA_VERSION_TABLE_SQLITE = """
+CREATE TABLE IF NOT EXISTS `schema_version` (
+  `name` varchar(255) NOT NULL PRIMARY KEY,
+  `checksum` char(64) NOT NULL,
+  `applied_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class SchemaManager:
+    """
+    Applies requirements.sql and the ordered files in migrations/ at most once.
+
+    Every applied script is recorded with its SHA-256 checksum in the
+    `schema_version` table. When nothing changed, startup costs a single SELECT on
+    that table. Otherwise one worker takes a MySQL advisory lock (GET_LOCK), applies
+    the pending scripts and records them while the other workers wait.
+
+    Backends without advisory locks (SQLite) apply the scripts without locking.
+    They use their own requirements script and the `<name>.sqlite.sql` variant
+    of a migration where one exists.
+    """
+
+    def __init__(self, create_connection: Callable[[], Any], lock_timeout: int = 60, backend: Optional[Any] = None):
+        self.create_connection = create_connection
+        self.lock_timeout = lock_timeout
+        self.backend = backend or MySQLBackend
+        self.base_dir = os.path.dirname(__file__)
+        self.migrations_dir = os.path.join(self.base_dir, "migrations")
+
+
+    def load_scripts(self) -> List[Tuple[str, str, str]]:
+        """Return (name, sql, checksum) for requirements.sql followed by all migrations in order"""
+        requirements_file = os.path.join(self.base_dir, self.backend.requirements_script)
+        if not os.path.exists(requirements_file):
+            logger.error(f"Requirements file '{requirements_file}' does not exist")
+            raise FileNotFoundError(f"Requirements file '{requirements_file}' not found")
+
+        paths = [(self.backend.requirements_script, requirements_file)]
+        if os.path.isdir(self.migrations_dir):
+            file_names = set(os.listdir(self.migrations_dir))
+            for file_name in sorted(file_names):
+                if not file_name.endswith(".sql") or file_name.endswith(".sqlite.sql"):
+                    continue
+                variant = file_name[:-len(".sql")] + f".{self.backend.name}.sql"
+                path_name = variant if variant in file_names else file_name
+                paths.append((f"migrations/{file_name}", os.path.join(self.migrations_dir, path_name)))
+
+        scripts = []
+        for name, path in paths:
+            with open(path, 'r') as file:
+                sql_script = file.read()
+            scripts.append((name, sql_script, hashlib.sha256(sql_script.encode("utf-8")).hexdigest()))
+        return scripts
+
+
+    def ensure_schema(self) -> None:
+        """Apply all pending scripts, or return after one SELECT if the schema is current"""
+        scripts = self.load_scripts()
+
+        connection = self.create_connection()
+        cursor = connection.cursor()
+        try:
+            pending = self._pending_scripts(scripts, self._applied_checksums(cursor))
+            if not pending:
+                logger.info("Database schema is up to date")
+                return
+
+            self._acquire_lock(cursor)
+            try:
+                # Another worker may have applied the scripts while we waited for the lock
+                if self.backend.supports_advisory_locks:
+                    cursor.execute(CREATE_SCHEMA_VERSION_TABLE)
+                else:
+                    cursor.execute(CREATE_SCHEMA_VERSION_TABLE_SQLITE)
+                pending = self._pending_scripts(scripts, self._applied_checksums(cursor))
+                for name, sql_script, checksum in pending:
+                    self._apply_script(cursor, name, sql_script, checksum)
+                    connection.commit()
+                logger.info(f"Database schema updated successfully ({len(pending)} script(s) applied)")
+            finally:
+                self._release_lock(cursor)
+        except self.backend.Error as err:
+            logger.error(f"Error updating database schema: {err}")
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+
+    def _acquire_lock(self, cursor) -> None:
+        """Take the advisory schema lock, waiting up to lock_timeout seconds"""
+        if not self.backend.supports_advisory_locks:
+            return
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (SCHEMA_LOCK_NAME, self.lock_timeout))
+        (locked,) = cursor.fetchall()[0]
+        if locked != 1:
+            logger.error(f"Could not acquire schema lock '{SCHEMA_LOCK_NAME}' within {self.lock_timeout}s")
+            raise TimeoutError(f"Timed out waiting for schema lock '{SCHEMA_LOCK_NAME}'")
+
+
+    def _release_lock(self, cursor) -> None:
+        if not self.backend.supports_advisory_locks:
+            return
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (SCHEMA_LOCK_NAME,))
+        cursor.fetchall()
+
+
+    def _applied_checksums(self, cursor) -> Dict[str, str]:
+        """Read the recorded checksums, treating a missing version table as an empty schema"""
+        try:
+            cursor.execute("SELECT name, checksum FROM schema_version")
+            return {name: checksum for name, checksum in cursor.fetchall()}
+        except self.backend.Error as err:
+            if err.errno == errorcode.ER_NO_SUCH_TABLE:
+                return {}
+            raise
+
+
+    def _pending_scripts(self, scripts: List[Tuple[str, str, str]], applied: Dict[str, str]) -> List[Tuple[str, str, str]]:
+        """Select the scripts that still need to run"""
+        pending = []
+        for name, sql_script, checksum in scripts:
+            if name not in applied:
+                pending.append((name, sql_script, checksum))
+            elif applied[name] != checksum:
+                if name in REQUIREMENTS_SCRIPTS:
+                    # requirements.sql is idempotent and re-applied whenever it changes
+                    pending.append((name, sql_script, checksum))
+                else:
+                    logger.warning(f"Migration '{name}' changed after it was applied, it will not be run again")
+        return pending
+
+
+    def _apply_script(self, cursor, name: str, sql_script: str, checksum: str) -> None:
+        """Run every statement of a script and record its checksum"""
+        logger.info(f"Applying schema script '{name}'")
+        for statement in sql_script.split(';'):
+            if statement.strip():
+                cursor.execute(statement)
+        cursor.execute(
+            "REPLACE INTO schema_version (name, checksum) VALUES (%s, %s)",
+            (name, checksum)
+        )
@@ -0,0 +1,48 @@
+"""
+Streaming helpers for large list responses
+"""
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from pydantic import BaseModel
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def stream_json_array(models: Iterable[BaseModel], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Serialize models into a JSON array chunk by chunk, for use with StreamingResponse"""
+    buffer = bytearray(b"[")
+    try:
+        for index, model in enumerate(models):
+            if index:
+                buffer += b","
+            buffer += model.model_dump_json().encode("utf-8")
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b"]"
+        yield bytes(buffer)
+    finally:
+        close = getattr(models, "close", None)
+        if close is not None:
+            close()
+
+
+async def astream_json_array(models: AsyncIterable[BaseModel], chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Async variant of stream_json_array"""
+    buffer = bytearray(b"[")
+    try:
+        first = True
+        async for model in models:
+            if not first:
+                buffer += b","
+            first = False
+            buffer += model.model_dump_json().encode("utf-8")
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b"]"
+        yield bytes(buffer)
+    finally:
+        aclose = getattr(models, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -126,14 +126,14 @@ class StripeService:
 
         # Process the event based on its type
         if event['type'] == 'checkout.session.completed':
-            return self._handle_checkout_session(
+            return await self._handle_checkout_session(
                 data_id=_data_id,
                 db_service=db_service,
                 i18n_service=i18n_service,
                 locale=locale
                 )
         elif event['type'] == 'customer.subscription.deleted':
-            return self._handle_subscription_deleted(
+            return await self._handle_subscription_deleted(
                 data_id=_data_id,
                 db_service=db_service,
                 i18n_service=i18n_service,
@@ -143,7 +143,7 @@ class StripeService:
             return {"detail": i18n_service.t("api.stripe.webhook.event_not_handled", locale, error=event['type'])}
         
     
-    def _handle_checkout_session(
+    async def _handle_checkout_session(
             self, 
             data_id: str,
             db_service: DatabaseService,
@@ -203,7 +203,7 @@ class StripeService:
                 )
             )
 
-        user = UserQueries.get_user_by_id(user_id=user_id, db_service=db_service)
+        user = await db_service.run(UserQueries.get_user_by_id, user_id=user_id, db_service=db_service)
         if user is None:
             ## This case can only occur, if someone opens the paymentlink without being registered
             logger.error(f"User with id '{user_id}' not found in database")
@@ -227,7 +227,8 @@ class StripeService:
                 )
             )
         
-        msg = UserQueries.update_user_premium_level(
+        msg = await db_service.run(
+            UserQueries.update_user_premium_level,
             user_id=user_id,
             new_premium_level=new_premium_level,
             stripe_customer_id=stripe_customer_id,
@@ -240,7 +241,7 @@ class StripeService:
         return msg
     
 
-    def _handle_subscription_deleted(
+    async def _handle_subscription_deleted(
             self, 
             data_id: str,
             db_service: DatabaseService,
@@ -273,7 +274,8 @@ class StripeService:
                 detail=i18n_service.t("api.stripe.webhook.invalid_event", locale)
             )
 
-        user = UserQueries.get_user_by_stripe_customer_id(
+        user = await db_service.run(
+            UserQueries.get_user_by_stripe_customer_id,
             stripe_customer_id=stripe_customer_id,
             db_service=db_service
             )
@@ -284,7 +286,8 @@ class StripeService:
                 detail=i18n_service.t("api.auth.user_management.user_not_found", locale)
             )
  
-        msg = UserQueries.update_user_premium_level(
+        msg = await db_service.run(
+            UserQueries.update_user_premium_level,
             user_id=user.id,
             new_premium_level=0,
             stripe_customer_id=user.stripe_customer_id,
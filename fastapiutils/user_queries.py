@@ -4,10 +4,41 @@ Authentication database queries
 from fastapi import HTTPException, status
 from .i18n_service import I18nService
 from .models import UserInDBNoPassword, UserInDB, UpdateUser
-from .database_service import DatabaseService
+from .database_service import DatabaseService, is_duplicate_key_error
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Iterator, Optional, Tuple
+
+CREATE_USER_ATTEMPTS = 3
+
+# Column lists matching the models the queries return
+USER_NO_PASSWORD_COLUMNS = (
+    "id, username, email, email_verified, is_admin, premium_level, stripe_customer_id, disabled, created_at, last_seen"
+)
+USER_IN_DB_COLUMNS = USER_NO_PASSWORD_COLUMNS + ", hashed_password"
+
+SELECT_USER_BY_ID = f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE id = %s"
+# username and email compare case-insensitively through their collation
+# (utf8mb4_0900_ai_ci, NOCASE on SQLite), so plain equality can use their unique keys
+SELECT_USER_BY_USERNAME = f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE username = %s"
+SELECT_USER_BY_EMAIL = f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE email = %s"
+# Both branches are unique key lookups, a username match wins over an email match
+SELECT_USER_BY_LOGIN = (
+    f"SELECT {USER_IN_DB_COLUMNS}, 0 AS login_match FROM user WHERE username = %s "
+    f"UNION ALL SELECT {USER_IN_DB_COLUMNS}, 1 AS login_match FROM user WHERE email = %s "
+    "ORDER BY login_match LIMIT 1"
+)
+# Answered from the (id, username) covering index without reading the rows
+SELECT_USERNAME_BY_ID = "SELECT username FROM user WHERE id = %s"
+SELECT_ALL_USERS = f"SELECT {USER_NO_PASSWORD_COLUMNS} FROM user"
+
+# Lookups of the authentication path, run on every connection by DatabaseService.startup()
+WARM_UP_STATEMENTS = (
+    (SELECT_USER_BY_ID, ("",)),
+    (SELECT_USER_BY_USERNAME, ("",)),
+    (SELECT_USER_BY_EMAIL, ("",)),
+    (SELECT_USER_BY_LOGIN, ("", "")),
+)
 
 
 class UserQueries:
@@ -15,10 +46,19 @@ class UserQueries:
     
     @staticmethod
     def get_user_by_id(user_id: str, db_service: DatabaseService) -> Optional[UserInDB]:
-        """Get user by ID"""
+        """Get user by ID, served from the user cache when enabled"""
+        return db_service.get_cached_user(
+            user_id,
+            lambda: UserQueries._select_user_by_id(user_id, db_service)
+        )
+    
+    @staticmethod
+    def _select_user_by_id(user_id: str, db_service: DatabaseService) -> Optional[UserInDB]:
+        """Read a user by ID from the database, bypassing the user cache"""
         result = db_service.execute_single_query(
-            "SELECT * FROM user WHERE id = %s", 
-            (user_id,)
+            SELECT_USER_BY_ID,
+            (user_id,),
+            cache_tables=("user",)
         )
         if result:
             return UserInDB(**result)
@@ -28,8 +68,9 @@ class UserQueries:
     def get_user_by_username(username: str, db_service: DatabaseService) -> Optional[UserInDB]:
         """Get user by username"""
         result = db_service.execute_single_query(
-            "SELECT * FROM user WHERE LOWER(username) = LOWER(%s)", 
-            (username,)
+            SELECT_USER_BY_USERNAME,
+            (username,),
+            cache_tables=("user",)
         )
         if result:
             return UserInDB(**result)
@@ -39,18 +80,40 @@ class UserQueries:
     def get_user_by_email(email: str, db_service: DatabaseService) -> Optional[UserInDB]:
         """Get user by email"""
         result = db_service.execute_single_query(
-            "SELECT * FROM user WHERE LOWER(email) = LOWER(%s)", 
-            (email,)
+            SELECT_USER_BY_EMAIL,
+            (email,),
+            cache_tables=("user",)
         )
         if result:
             return UserInDB(**result)
         return None
     
+    @staticmethod
+    def get_user_by_login(identifier: str, db_service: DatabaseService) -> Optional[UserInDB]:
+        """Get user by username, or by email if no username matches, in one query"""
+        result = db_service.execute_single_query(
+            SELECT_USER_BY_LOGIN,
+            (identifier, identifier),
+            cache_tables=("user",)
+        )
+        if result:
+            return UserInDB(**result)
+        return None
+    
+    @staticmethod
+    def get_username_and_email_taken(username: str, email: str, db_service: DatabaseService) -> Tuple[bool, bool]:
+        """Check in one round trip whether a username and an email are already in use"""
+        results = db_service.batch([
+            ("SELECT 1 FROM user WHERE username = %s", (username,)),
+            ("SELECT 1 FROM user WHERE email = %s", (email,)),
+        ]) or [[], []]
+        return bool(results[0]), bool(results[1])
+    
     @staticmethod
     def get_user_by_username_and_email(username: str, email: str, db_service: DatabaseService) -> Optional[UserInDB]:
         """Get user by username and email"""
         result = db_service.execute_single_query(
-            "SELECT * FROM user WHERE LOWER(username) = LOWER(%s) AND LOWER(email) = LOWER(%s)", 
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE username = %s AND email = %s",
             (username, email)
         )
         if result:
@@ -64,7 +127,7 @@ class UserQueries:
         ) -> Optional[UserInDB]:
         """Get user by Stripe customer ID"""
         result = db_service.execute_single_query(
-            "SELECT * FROM user WHERE stripe_customer_id = %s", 
+            f"SELECT {USER_IN_DB_COLUMNS} FROM user WHERE stripe_customer_id = %s",
             (stripe_customer_id,)
         )
         if result:
@@ -80,13 +143,13 @@ class UserQueries:
         locale: str = "en"
         ) -> str:
         """Get username by user ID"""
-        user = UserQueries.get_user_by_id(user_id, db_service)
-        if not user:
+        result = db_service.execute_single_query(SELECT_USERNAME_BY_ID, (user_id,), cache_tables=("user",))
+        if not result:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=i18n_service.t("api.auth.user_management.user_not_found", locale),
             )
-        return user.username
+        return result["username"]
     
     
     @staticmethod
@@ -98,21 +161,30 @@ class UserQueries:
                     locale: str
                    ) -> None:
         """Create a new user in the database"""
-        uid = UserQueries.generate_user_uuid(db_service=db_service)
-        if uid is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=i18n_service.t("api.auth.user_management.user_creation_failed", locale),
-            )
-        db_service.execute_modification_query(
-            "INSERT INTO user (id, username, email, hashed_password) VALUES (%s, %s, %s, %s)",
-            (uid, username, email, hashed_password)
+        # IDs are generated locally, so only a real primary key collision is retried
+        for _ in range(CREATE_USER_ATTEMPTS):
+            uid = UserQueries.generate_user_uuid(db_service=db_service)
+            try:
+                db_service.execute_modification_query(
+                    "INSERT INTO user (id, username, email, hashed_password) VALUES (%s, %s, %s, %s)",
+                    (uid, username, email, hashed_password)
+                )
+                return
+            except Exception as e:
+                if not is_duplicate_key_error(e, key="PRIMARY"):
+                    raise
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=i18n_service.t("api.auth.user_management.user_creation_failed", locale),
         )
     
     @staticmethod
     def update_user_last_seen(user_id: str, db_service: DatabaseService) -> None:
-        """Update user's last seen timestamp"""
+        """Update user's last seen timestamp, buffered and written in batches when enabled"""
         current_time = datetime.now(timezone.utc)
+        if db_service.last_seen_buffer is not None:
+            db_service.last_seen_buffer.record(user_id, current_time)
+            return
         db_service.execute_modification_query(
             "UPDATE user SET last_seen = %s WHERE id = %s", 
             (current_time, user_id)
@@ -129,6 +201,7 @@ class UserQueries:
             "UPDATE user SET hashed_password = %s WHERE id = %s",
             (hashed_password, user_id)
         )
+        db_service.invalidate_user(user_id)
     
     @staticmethod
     def update_user_fields(user_id: str, user_update: UpdateUser, db_service: DatabaseService) -> bool:
@@ -144,12 +217,13 @@ class UserQueries:
             update_values.append(user_id)
             query = f"UPDATE user SET {', '.join(update_fields)} WHERE id = %s"
             db_service.execute_modification_query(query, tuple(update_values))
+            db_service.invalidate_user(user_id)
         
         return len(update_fields) > 0  # Return True if any fields were updated
 
     @staticmethod
     def generate_user_uuid(db_service: DatabaseService) -> Optional[str]:
-        """Generate a new UUID for a user"""
+        """Generate a new time-ordered UUID for a user"""
         return db_service.generate_uuid("user")
     
     @staticmethod
@@ -169,6 +243,8 @@ class UserQueries:
                 sql = f"SELECT id, username FROM user WHERE id IN ({placeholders})",
                 params=tuple(user_ids)
                 )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -190,8 +266,10 @@ class UserQueries:
         ) -> list[UserInDBNoPassword]:
         """Get all users from the database"""
         try:
-            results = db_service.execute_query("SELECT * FROM user")
+            results = db_service.execute_query(SELECT_ALL_USERS)
             return [UserInDBNoPassword(**result) for result in results] if results else []
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -202,6 +280,34 @@ class UserQueries:
                 ),
             )
         
+    @staticmethod
+    def iter_all_users(
+        db_service: DatabaseService,
+        i18n_service: I18nService,
+        locale: str = "en",
+        batch_size: int = 1000
+        ) -> Iterator[UserInDBNoPassword]:
+        """Stream all users from the database without loading the whole table into memory"""
+        try:
+            rows = db_service.iter_query(SELECT_ALL_USERS, batch_size=batch_size)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=i18n_service.t(
+                    "api.auth.user_management.get_all_users_failed",
+                    locale=locale,
+                    error=str(e)
+                ),
+            )
+
+        def _users() -> Iterator[UserInDBNoPassword]:
+            with rows:
+                for row in rows:
+                    yield UserInDBNoPassword(**row)
+        return _users()
+        
     @staticmethod
     def delete_user(
         user_id: str,
@@ -223,7 +329,10 @@ class UserQueries:
                 sql="DELETE FROM user WHERE id = %s",
                 params=(user_id,)
             )
+            db_service.invalidate_user(user_id)
             return {"detail": i18n_service.t("api.auth.user_management.user_deleted_successfully", locale=locale)}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -256,12 +365,15 @@ class UserQueries:
                     sql="UPDATE user SET premium_level = %s WHERE id = %s",
                     params=(new_premium_level, user_id)
                 )
+            db_service.invalidate_user(user_id)
             return {"detail": i18n_service.t(
                 key="api.auth.user_management.premium_level_updated", 
                 locale=locale,
                 user_id=user_id, 
                 new_premium_level=new_premium_level
             )}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -79,17 +79,21 @@ class UserValidators:
         UserValidators.validate_username_format(user.username, locale, i18n_service)
         UserValidators.validate_email_format(user.email, locale, i18n_service)
         UserValidators.validate_password_strength(user.password, locale, i18n_service)
-        UserValidators.validate_username_unique(
+        username_taken, email_taken = UserQueries.get_username_and_email_taken(
             username=user.username,
-            locale=locale, 
-            db_service=db_service, 
-            i18n_service=i18n_service)
-        UserValidators.validate_email_unique(
             email=user.email,
-            locale=locale, 
-            db_service=db_service, 
-            i18n_service=i18n_service
+            db_service=db_service
         )
+        if username_taken:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=i18n_service.t("api.auth.validation.username_taken", locale),
+            )
+        if email_taken:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=i18n_service.t("api.auth.validation.email_taken", locale),
+            )
     
     @staticmethod
     def validate_user_update(user_update: UpdateUser, locale: str, 
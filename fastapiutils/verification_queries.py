@@ -3,7 +3,7 @@ Verification database queries
 """
 from fastapi import HTTPException, status
 
-from .user_queries import UserQueries
+from .user_queries import SELECT_USER_BY_EMAIL
 from .i18n_service import I18nService
 from .models import UserInDB, VerificationCode
 from .database_service import DatabaseService
@@ -44,34 +44,46 @@ class VerificationQueries:
         locale: str = "en"
         ) -> str:
         """Create or update regular verification code for user"""
-        if not user: user = UserQueries.get_user_by_email(email=email, db_service=db_service)
-        VerificationQueries.check_can_send_verification(
-            user=user,
-            locale=locale,
-            db_service=db_service,
-            i18n_service=i18n_service
-        )
+        with db_service.transaction():
+            # Fetch the user and their current code in one round trip
+            if user:
+                statements = [("SELECT * FROM verification_code WHERE user_id = %s", (user.id,))]
+            else:
+                statements = [
+                    (SELECT_USER_BY_EMAIL, (email,)),
+                    (
+                        "SELECT verification_code.* FROM verification_code "
+                        "JOIN user ON user.id = verification_code.user_id WHERE user.email = %s",
+                        (email,)
+                    ),
+                ]
+            results = db_service.batch(statements) or [[] for _ in statements]
+            if not user and results[0]:
+                user = UserInDB(**results[0][0])
+            existing_code = results[-1][0] if user and results[-1] else None
+            VerificationQueries._check_cooldown(
+                user=user,
+                existing_code=existing_code,
+                i18n_service=i18n_service,
+                locale=locale
+            )
 
-        new_code = VerificationQueries._generate_verification_code()
-        current_time = datetime.now(timezone.utc)
+            new_code = VerificationQueries._generate_verification_code()
+            current_time = datetime.now(timezone.utc)
 
-        # Check if verification code already exists for this user
-        existing_code = VerificationQueries.get_verification_code_by_user_id(
-            user_id=user.id, db_service=db_service
-        )
-        if existing_code:
-            # Update existing code
-            db_service.execute_modification_query(
-                "UPDATE verification_code SET value = %s, created_at = %s, verified_at = NULL WHERE user_id = %s",
-                (new_code, current_time, user.id)
-            )
-        else:
-            # Insert new code
-            db_service.execute_modification_query(
-                "INSERT INTO verification_code (user_id, value, created_at) VALUES (%s, %s, %s)",
-                (user.id, new_code, current_time)
-            )
-        return new_code
+            if existing_code:
+                # Update existing code
+                db_service.execute_modification_query(
+                    "UPDATE verification_code SET value = %s, created_at = %s, verified_at = NULL WHERE user_id = %s",
+                    (new_code, current_time, user.id)
+                )
+            else:
+                # Insert new code
+                db_service.execute_modification_query(
+                    "INSERT INTO verification_code (user_id, value, created_at) VALUES (%s, %s, %s)",
+                    (user.id, new_code, current_time)
+                )
+            return new_code
     
 
     @staticmethod
@@ -92,16 +104,31 @@ class VerificationQueries:
         locale: str = "en"
         ) -> bool:
         """Check if user can resend verification code (1 minute cooldown)"""
+        existing_code = db_service.execute_single_query(
+            "SELECT created_at FROM verification_code WHERE user_id = %s",
+            (user.id,)
+        ) if user else None
+        return VerificationQueries._check_cooldown(
+            user=user,
+            existing_code=existing_code,
+            i18n_service=i18n_service,
+            locale=locale
+        )
+
+
+    @staticmethod
+    def _check_cooldown(
+        user: Optional[UserInDB],
+        existing_code: Optional[dict],
+        i18n_service: I18nService,
+        locale: str = "en"
+        ) -> None:
+        """Raise if the user does not exist or their last code is younger than 1 minute"""
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=i18n_service.t("api.auth.user_management.user_not_found", locale),
             )
-        
-        existing_code = db_service.execute_single_query(
-            "SELECT created_at FROM verification_code WHERE user_id = %s",
-            (user.id,)
-        )
 
         if not existing_code:
             return None  # No existing code, can send
@@ -125,6 +152,7 @@ class VerificationQueries:
             "UPDATE user SET email_verified = %s WHERE id = %s",
             (1 if verified else 0, user_id)
         )
+        db_service.invalidate_user(user_id)
     
     @staticmethod
     def update_user_email(user_id: str, new_email: str, db_service: DatabaseService) -> None:
@@ -133,3 +161,4 @@ class VerificationQueries:
             "UPDATE user SET email = %s WHERE id = %s",
             (new_email, user_id)
         )
+        db_service.invalidate_user(user_id)
@@ -40,6 +40,9 @@ setup(
         "uvicorn==0.35.0"
     ],
     extras_require={
+        "async": [
+            "aiomysql==0.2.0",
+        ],
         "dev": [
             "pytest>=6.0",
             "pytest-asyncio>=0.15.0",
@@ -48,6 +51,6 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "fastapiutils": ["locales/*.json", "*.sql", "config/*.json", "templates/*.html"],
+        "fastapiutils": ["locales/*.json", "*.sql", "migrations/*.sql", "config/*.json", "templates/*.html"],
     },
 )
@@ -0,0 +1,70 @@
+import pytest
+
+from fastapiutils import resilience
+from fastapiutils.resilience import CircuitBreaker, DatabaseUnavailableError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+def test_opens_after_threshold_and_rejects_with_retry_after(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(DatabaseUnavailableError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers["Retry-After"] == "30"
+    assert breaker.status() == {"state": "open", "failures": 2}
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.status() == {"state": "closed", "failures": 1}
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_call()
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    assert breaker.status()["state"] == "closed"
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.before_call()
+    assert breaker.status()["state"] == "open"
+
+
+def test_threshold_zero_disables_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    breaker.before_call()
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from fastapiutils.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("server gone")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def creator():
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+
+    return ConnectionPool(creator, **kwargs), created
+
+
+def test_released_connections_are_reused():
+    pool, created = make_pool(size=2, max_overflow=0)
+    first = pool.acquire()
+    first.close()
+    second = pool.acquire()
+    assert second.raw_connection is first.raw_connection
+    assert len(created) == 1
+    assert pool.status() == {"size": 2, "max_overflow": 0, "open": 1, "idle": 0, "checked_out": 1}
+
+
+def test_overflow_connections_are_closed_on_release():
+    pool, created = make_pool(size=1, max_overflow=1)
+    first, second = pool.acquire(), pool.acquire()
+    first.close()
+    second.close()
+    assert [connection.closed for connection in created] == [False, True]
+    assert pool.status()["open"] == 1
+
+
+def test_acquire_times_out_when_exhausted():
+    pool, _ = make_pool(size=1, max_overflow=0, timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+
+def test_waiting_acquire_gets_released_connection():
+    pool, _ = make_pool(size=1, max_overflow=0, timeout=5)
+    held = pool.acquire()
+    threading.Timer(0.05, held.close).start()
+    assert pool.acquire().raw_connection is held.raw_connection
+
+
+def test_release_rolls_back_open_transaction():
+    pool, created = make_pool(size=1, max_overflow=0)
+    connection = pool.acquire()
+    connection.raw_connection.in_transaction = True
+    connection.close()
+    assert created[0].rollbacks == 1
+
+
+def test_dead_idle_connection_is_replaced():
+    pool, created = make_pool(size=1, max_overflow=0)
+    connection = pool.acquire()
+    connection.close()
+    created[0].alive = False
+    replacement = pool.acquire()
+    assert replacement.raw_connection is created[1]
+    assert created[0].closed
+
+
+def test_dispose_refuses_checkouts_and_closes_connections_on_release():
+    pool, created = make_pool(size=2, max_overflow=0)
+    in_use = pool.acquire()
+    pool.dispose()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    in_use.close()
+    assert created[0].closed
+    assert pool.status()["open"] == 0
+
+
+def test_wait_closed_waits_for_connections_in_use():
+    pool, _ = make_pool(size=2, max_overflow=0)
+    in_use = pool.acquire()
+    pool.dispose()
+    assert not pool.wait_closed(0.01)
+    in_use.close()
+    assert pool.wait_closed(0.01)
+
+
+def test_warm_opens_idle_connections_up_to_pool_size():
+    pool, created = make_pool(size=2, max_overflow=5)
+    primed = []
+    assert pool.warm(5, primed.append) == 2
+    assert len(created) == 2 and len(primed) == 2
+    assert pool.status()["checked_out"] == 0
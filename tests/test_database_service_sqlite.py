@@ -0,0 +1,65 @@
+import pytest
+
+from fastapiutils.database_service import DatabaseService, is_duplicate_key_error
+from fastapiutils.models import UserInDB, UserInDBNoPassword
+
+INSERT_USER = "INSERT INTO user (id, username, email, hashed_password) VALUES (%s, %s, %s, %s)"
+
+
+@pytest.fixture
+def db_service(monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("DB_SQLITE_PATH", ":memory:")
+    monkeypatch.setenv("DB_QUERY_CACHE_SIZE", "100")
+    db_service = DatabaseService()
+    yield db_service
+    db_service.close()
+
+
+def user_rows(count):
+    return [(f"{i:036d}", f"user{i}", f"user{i}@example.com", "x" * 60) for i in range(count)]
+
+
+def test_execute_many_modification_inserts_in_batches(db_service):
+    assert db_service.execute_many_modification(INSERT_USER, user_rows(5), batch_size=2) == [2, 2, 1]
+    rows = db_service.execute_query("SELECT username FROM user ORDER BY username")
+    assert [row["username"] for row in rows] == [f"user{i}" for i in range(5)]
+
+
+def test_execute_many_modification_runs_other_statements_per_row(db_service):
+    db_service.execute_many_modification(INSERT_USER, user_rows(3))
+    db_service.execute_many_modification(
+        "UPDATE user SET username = %s WHERE id = %s",
+        [(f"renamed{i}", f"{i:036d}") for i in range(3)],
+    )
+    rows = db_service.execute_query("SELECT username FROM user ORDER BY username")
+    assert [row["username"] for row in rows] == ["renamed0", "renamed1", "renamed2"]
+
+
+def test_writes_invalidate_cached_query_results(db_service):
+    db_service.execute_many_modification(INSERT_USER, user_rows(1))
+    count_sql = "SELECT COUNT(*) AS users FROM user"
+    assert db_service.execute_query(count_sql, cache_tables=("user",))[0]["users"] == 1
+    db_service.execute_many_modification(INSERT_USER, user_rows(2)[1:])
+    assert db_service.execute_query(count_sql, cache_tables=("user",))[0]["users"] == 2
+
+
+def test_fetch_one_and_fetch_all_build_models(db_service):
+    db_service.execute_many_modification(INSERT_USER, user_rows(2))
+    user = db_service.fetch_one("SELECT * FROM user WHERE id = %s", (f"{1:036d}",), model=UserInDB)
+    assert user.username == "user1" and not user.email_verified
+    assert db_service.fetch_one("SELECT * FROM user WHERE id = %s", ("missing",), model=UserInDB) is None
+    users = db_service.fetch_all("SELECT * FROM user ORDER BY username", model=UserInDBNoPassword)
+    assert [user.username for user in users] == ["user0", "user1"]
+
+
+def test_duplicate_key_errors_name_the_violated_key(db_service):
+    db_service.execute_many_modification(INSERT_USER, user_rows(1))
+    (user_id, username, email, hashed_password), = user_rows(1)
+    with pytest.raises(db_service.backend.Error) as primary:
+        db_service.execute_modification_query(INSERT_USER, (user_id, "other", "other@example.com", hashed_password))
+    assert is_duplicate_key_error(primary.value, key="PRIMARY")
+    with pytest.raises(db_service.backend.Error) as unique:
+        db_service.execute_modification_query(INSERT_USER, (f"{9:036d}", username, "other@example.com", hashed_password))
+    assert is_duplicate_key_error(unique.value)
+    assert not is_duplicate_key_error(unique.value, key="PRIMARY")
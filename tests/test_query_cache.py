@@ -0,0 +1,91 @@
+import pytest
+
+from fastapiutils import query_cache
+from fastapiutils.query_cache import ObjectCache, QueryCache, TTLCache, written_table
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_cache, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("sql, table", [
+    ("INSERT INTO user (id) VALUES (%s)", "user"),
+    ("insert ignore into `Feedback` (email) values (%s)", "feedback"),
+    ("REPLACE INTO schema_version (name) VALUES (%s)", "schema_version"),
+    ("UPDATE user SET username = %s WHERE id = %s", "user"),
+    ("UPDATE IGNORE app.user SET email = %s", "user"),
+    ("DELETE FROM verification_code WHERE user_id = %s", "verification_code"),
+    ("UPDATE user JOIN verification_code ON user.id = verification_code.user_id SET email_verified = 1", None),
+    ("SELECT * FROM user", None),
+])
+def test_written_table(sql, table):
+    assert written_table(sql) == table
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    clock.now += 10
+    assert cache.get("a", "missing") == "missing"
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["size"] == 0
+
+
+def test_query_cache_drops_entries_of_written_tables(clock):
+    cache = QueryCache(max_size=10, ttl=10)
+    generation = cache.generation(("user",))
+    cache.set("users", ["row"], ("user",), generation)
+    cache.set("codes", ["code"], ("verification_code",), cache.generation(("verification_code",)))
+    cache.invalidate("user")
+    assert cache.get("users", ("user",)) is None
+    assert cache.get("codes", ("verification_code",)) == ["code"]
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_query_cache_does_not_store_results_outdated_while_running(clock):
+    cache = QueryCache(max_size=10, ttl=10)
+    generation = cache.generation(("user",))
+    cache.invalidate("user")
+    cache.set("users", ["stale"], ("user",), generation)
+    assert cache.get("users", ("user",)) is None
+
+
+def test_query_cache_unknown_table_outdates_everything(clock):
+    cache = QueryCache(max_size=10, ttl=10)
+    cache.set("codes", ["code"], ("verification_code",), cache.generation(("verification_code",)))
+    cache.invalidate(None)
+    assert cache.get("codes", ("verification_code",)) is None
+
+
+def test_object_cache_invalidate_and_skipped_stale_store(clock):
+    cache = ObjectCache(max_size=10, ttl=10)
+    cache.set("u1", "alice", cache.epoch())
+    assert cache.get("u1") == "alice"
+    epoch = cache.epoch()
+    cache.invalidate("u1")
+    assert cache.get("u1") is None
+    cache.set("u1", "stale", epoch)
+    assert cache.get("u1") is None
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,35 @@
+from fastapiutils.database_service import rewrite_multi_row_insert
+
+
+def test_rewrites_single_row_insert_into_multi_row_insert():
+    sql, params = rewrite_multi_row_insert(
+        "INSERT INTO user (id, username) VALUES (%s, %s)",
+        [("u1", "alice"), ("u2", "bob")],
+    )
+    assert sql == "INSERT INTO user (id, username) VALUES (%s, %s), (%s, %s)"
+    assert params == ("u1", "alice", "u2", "bob")
+
+
+def test_keeps_insert_ignore_and_trailing_semicolon():
+    sql, params = rewrite_multi_row_insert("insert ignore into feedback (email) values (%s);", [("a",), ("b",), ("c",)])
+    assert sql == "insert ignore into feedback (email) values (%s), (%s), (%s)"
+    assert params == ("a", "b", "c")
+
+
+def test_keeps_placeholder_free_on_duplicate_key_update():
+    sql, params = rewrite_multi_row_insert(
+        "INSERT INTO user (id, last_seen) VALUES (%s, %s) ON DUPLICATE KEY UPDATE last_seen = VALUES(last_seen)",
+        [("u1", 1), ("u2", 2)],
+    )
+    assert sql == "INSERT INTO user (id, last_seen) VALUES (%s, %s), (%s, %s) ON DUPLICATE KEY UPDATE last_seen = VALUES(last_seen)"
+    assert sql.count("%s") == len(params)
+
+
+def test_skips_on_duplicate_key_update_with_placeholders():
+    sql = "INSERT INTO user (id, last_seen) VALUES (%s, %s) ON DUPLICATE KEY UPDATE last_seen = %s"
+    assert rewrite_multi_row_insert(sql, [("u1", 1, 1), ("u2", 2, 2)]) is None
+
+
+def test_skips_statements_that_are_not_simple_inserts():
+    assert rewrite_multi_row_insert("UPDATE user SET username = %s WHERE id = %s", [("a", "u1")]) is None
+    assert rewrite_multi_row_insert("INSERT INTO user (id) SELECT id FROM other WHERE id = %s", [("u1",)]) is None